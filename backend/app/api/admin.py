@@ -0,0 +1,55 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Form
+from app.core.config import ADMIN_TOKEN
+from app.core.profiler import forward_profiler, PROFILE_TARGETS
+from app.core.inference_pool import inference_pool
+
+router = APIRouter()
+
+
+def _require_admin(token: Optional[str]):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+async def _profiler(action: str, **kwargs):
+    # With inference workers the forward passes (and so the captures) happen there
+    if inference_pool.enabled:
+        return {"workers": await inference_pool.broadcast("profile", action=action, **kwargs)}
+    if action == "arm":
+        return forward_profiler.arm(**kwargs)
+    if action == "disarm":
+        return forward_profiler.disarm(**kwargs)
+    return forward_profiler.status()
+
+
+# -------------------- PROFILER ROUTES --------------------
+@router.post("/admin/profile", include_in_schema=False)
+async def arm_profiler(
+    target: str = Form(...),
+    passes: int = Form(1),
+    record_shapes: bool = Form(True),
+    profile_memory: bool = Form(True),
+    x_admin_token: Optional[str] = Header(None),
+):
+    _require_admin(x_admin_token)
+    if target not in PROFILE_TARGETS:
+        raise HTTPException(status_code=400, detail=f"target must be one of {', '.join(PROFILE_TARGETS)}")
+    return await _profiler(
+        "arm", target=target, passes=passes, record_shapes=record_shapes, profile_memory=profile_memory
+    )
+
+
+@router.get("/admin/profile", include_in_schema=False)
+async def profiler_status(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return await _profiler("status")
+
+
+@router.delete("/admin/profile", include_in_schema=False)
+async def disarm_profiler(target: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return await _profiler("disarm", target=target)
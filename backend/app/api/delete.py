@@ -2,6 +2,9 @@ from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
 import os
 from app.db.supabase import supabase
+from app.core.executor import run_io
+from app.utils.gallery_store import gallery_store
+from app.utils.user_cache import invalidate_user
 
 router = APIRouter()
 
@@ -9,10 +12,10 @@ router = APIRouter()
 @router.delete("/delete/")
 async def delete_prediction(prediction_id: str = Query(...)):
     try:
-        result = supabase.table("predictions")\
-            .select("id, storage_path")\
-            .eq("id", prediction_id)\
-            .execute()
+        query = supabase.table("predictions")\
+            .select("id, storage_path, user_email, style, image_url, image_hash")\
+            .eq("id", prediction_id)
+        result = await run_io(query.execute)
 
         if not result.data or len(result.data) == 0:
             return JSONResponse(content={"error": "Prediction not found"}, status_code=404)
@@ -23,10 +26,14 @@ async def delete_prediction(prediction_id: str = Query(...)):
         # Delete the image from storage if the path exists
         if storage_path:
             bucket = os.getenv("SUPABASE_BUCKET")
-            supabase.storage.from_(bucket).remove(storage_path)
+            await run_io(supabase.storage.from_(bucket).remove, storage_path)
 
         # Delete the DB entry
-        supabase.table("predictions").delete().eq("id", prediction_id).execute()
+        await run_io(supabase.table("predictions").delete().eq("id", prediction_id).execute)
+
+        # Keep the materialized gallery in step
+        await run_io(gallery_store.remove_row, record)
+        await run_io(invalidate_user, record.get("user_email"), "delete")
 
         return {"message": "Deleted from DB and storage ✅"}
     except Exception as e:
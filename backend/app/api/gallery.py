@@ -1,40 +1,30 @@
-from fastapi import APIRouter
+import json
+from typing import Optional
+from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
-from app.db.supabase import supabase
+from app.core.executor import run_io
+from app.utils.gallery_store import gallery_store
 
 router = APIRouter()
 
 # -------------------- GALLERY ROUTE --------------------
 @router.get("/gallery/")
-async def gallery(user_email: str):
+async def gallery(
+    user_email: str,
+    style: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """
+    ``{style: [image urls, newest first]}`` with duplicate images shown once.
+
+    ``style`` narrows the result to one group; ``offset``/``limit`` page
+    within each group. Group sizes come back in ``X-Gallery-Counts``.
+    """
     try:
-        data = (
-            supabase.table("predictions")
-            .select("style, image_url, image_hash")
-            .eq("user_email", user_email)
-            .order("timestamp", desc=True)
-            .execute()
-            .data
-        )
-
-        grouped = {}
-        seen_hashes = set()
-
-        for item in data:
-            style = item["style"]
-            url = item["image_url"]
-            image_hash = item.get("image_hash")
-
-            if image_hash in seen_hashes:
-                continue  # ✅ skip duplicate content
-
-            if style not in grouped:
-                grouped[style] = []
-
-            grouped[style].append(url)
-            seen_hashes.add(image_hash)
-
-        return grouped
+        # The materialized gallery is its own cache; it is not kept in the user cache
+        grouped, counts = await run_io(gallery_store.page, user_email, style, offset, limit)
+        return JSONResponse(content=grouped, headers={"X-Gallery-Counts": json.dumps(counts)})
 
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
\ No newline at end of file
+        return JSONResponse(content={"error": str(e)}, status_code=500)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.lifecycle import models
+from app.core.inference_pool import inference_pool
+
+router = APIRouter()
+
+# -------------------- LIVENESS --------------------
+@router.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+# -------------------- READINESS --------------------
+@router.get("/readyz")
+async def readyz():
+    # Includes per-model load/warmup times so startup regressions are visible
+    status = inference_pool.status() if inference_pool.enabled else models.status()
+    return JSONResponse(content=status, status_code=200 if status["ready"] else 503)
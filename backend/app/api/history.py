@@ -1,21 +1,127 @@
-from fastapi import APIRouter
+import base64
+import hashlib
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Query, Request, Response
 from fastapi.responses import JSONResponse
 from app.db.supabase import supabase
+from app.core.config import HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE
+from app.core.executor import run_io
+from app.utils.user_cache import cached_for_user
 
 router = APIRouter()
 
+# summary: enough for the history grid; full: every column, including the description
+HISTORY_FIELDS = {
+    "summary": "id, user_email, style, image_url, timestamp, confidence, image_hash",
+    "full": "*",
+}
+
+
+# -------------------- CURSORS --------------------
+def encode_cursor(row: dict) -> str:
+    raw = json.dumps([row["timestamp"], row["id"]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """
+    Returns ``(timestamp, id)`` normalized for the PostgREST filter string.
+
+    Both values are re-serialized from parsed types, so a crafted cursor
+    can't smuggle ``,`` ``)`` or ``"`` into the filter; raises ValueError.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        timestamp = datetime.fromisoformat(timestamp).isoformat()
+        if isinstance(row_id, bool) or not isinstance(row_id, (int, str)):
+            raise ValueError
+        row_id = row_id if isinstance(row_id, int) else str(uuid.UUID(row_id))
+        return timestamp, row_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def page_etag(body: bytes) -> str:
+    return 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+
+def load_page(user_email: str, limit: int, cursor: Optional[str], fields: str) -> dict:
+    query = supabase.table("predictions")\
+                    .select(HISTORY_FIELDS[fields])\
+                    .eq("user_email", user_email)
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.or_(
+            f'timestamp.lt."{timestamp}",and(timestamp.eq."{timestamp}",id.lt.{row_id})'
+        )
+    query = query.order("timestamp", desc=True)\
+                 .order("id", desc=True)\
+                 .limit(limit + 1)
+    rows = query.execute().data or []
+    page = rows[:limit]
+    return {"rows": page, "next": encode_cursor(page[-1]) if len(rows) > limit else None}
+
+
 # -------------------- HISTORY ROUTE --------------------
 @router.get("/history/")
-async def get_history(user_email: str):
+async def get_history(
+    request: Request,
+    user_email: str,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: str = "full",
+):
+    """
+    One page of a user's predictions, newest first.
+
+    The body stays a plain list; the cursor for the next page comes back in
+    the ``X-Next-Cursor`` header (and a ``Link: rel="next"``), absent on the
+    last page. Pages are keyset-paginated on (timestamp, id), so every page
+    costs the same however long the history is. Repeat requests sending the
+    page's ETag in If-None-Match get an empty 304.
+    """
+    if fields not in HISTORY_FIELDS:
+        return JSONResponse(
+            content={"error": f"fields must be one of {', '.join(HISTORY_FIELDS)}"}, status_code=400
+        )
+
     try:
-        response = supabase.table("predictions")\
-                           .select("*")\
-                           .eq("user_email", user_email)\
-                           .order("timestamp", desc=True)\
-                           .execute()
-        
-        print("History Data:", response.data)  # Log on backend
-
-        return response.data
+        if cursor:
+            decode_cursor(cursor)
+        # Served from the per-user cache until the user predicts or deletes
+        result = await run_io(
+            cached_for_user, "history", user_email, f"{fields}:{limit}:{cursor or ''}",
+            lambda: load_page(user_email, limit, cursor, fields),
+        )
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
\ No newline at end of file
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+    page = result["rows"]
+
+    headers = {"Cache-Control": "private, no-cache"}
+    if result["next"]:
+        next_cursor = result["next"]
+        headers["X-Next-Cursor"] = next_cursor
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    body = json.dumps(page, separators=(",", ":"), default=str).encode("utf-8")
+    # Whether (and where) the next page starts is part of the page identity
+    headers["ETag"] = page_etag(body + headers.get("X-Next-Cursor", "").encode("ascii"))
+
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
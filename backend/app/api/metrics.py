@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.core.metrics import metrics, CONTENT_TYPE
+from app.core.executor import pool_stats
+from app.core.batcher import classifier_batcher
+from app.core.inference_pool import inference_pool
+from app.utils.gemini_description import inflight_descriptions
+from app.utils.supabase_helpers import prediction_writer
+
+router = APIRouter()
+
+
+# -------------------- QUEUE DEPTH GAUGES --------------------
+# Read on scrape only, so they cost nothing on the request path
+def _executor_field(field: str):
+    return lambda: {(name,): stats[field] for name, stats in pool_stats().items()}
+
+
+metrics.gauge(
+    "painting_executor_queue_depth", "Jobs waiting for a slot in an executor pool", ["pool"],
+    collect=_executor_field("queued"),
+)
+metrics.gauge(
+    "painting_executor_active", "Jobs running on an executor pool", ["pool"],
+    collect=_executor_field("active"),
+)
+metrics.gauge(
+    "painting_classifier_queue_depth", "Images waiting for the classifier micro-batcher",
+    collect=classifier_batcher.queue_depth,
+)
+metrics.gauge(
+    "painting_inference_pool_pending", "Requests outstanding in the inference worker processes",
+    collect=inference_pool.queue_depth,
+)
+metrics.gauge(
+    "painting_gemini_inflight", "Gemini description calls in flight",
+    collect=inflight_descriptions,
+)
+metrics.gauge(
+    "painting_persistence_buffered", "Prediction rows spooled but not yet inserted",
+    collect=lambda: prediction_writer.stats()["buffered"] if prediction_writer is not None else 0,
+)
+
+
+# -------------------- PROMETHEUS ROUTE --------------------
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,152 @@
+import os
+import json
+import shutil
+import asyncio
+import tempfile
+import zipfile
+from typing import List, Optional
+from fastapi import APIRouter, File, UploadFile, Form
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.core.config import (
+    PREDICT_BATCH_CONCURRENCY, PREDICT_BATCH_MAX_ITEMS, PREDICT_BATCH_MAX_IMAGE_BYTES,
+)
+from app.core.executor import run_io
+from app.core.pipeline import run_prediction, RESPONSE_MODES
+from app.core.metrics import errors_total
+
+router = APIRouter()
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+def _spool_uploads(uploads: List[UploadFile], directory: str) -> List[tuple]:
+    # Copy uploads into a directory we own: the streamed response outlives the
+    # request's UploadFile objects, and this keeps file contents on disk.
+    spooled = []
+    for i, upload in enumerate(uploads):
+        path = os.path.join(directory, f"{i:06d}")
+        upload.file.seek(0)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(upload.file, out)
+        spooled.append((upload.filename or f"image_{i}", path))
+    return spooled
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def _iter_images(spooled_files: List[tuple], archive_path: Optional[str]):
+    """Yields (filename, bytes or error) one image at a time."""
+    for filename, path in spooled_files:
+        if os.path.getsize(path) > PREDICT_BATCH_MAX_IMAGE_BYTES:
+            yield filename, ValueError("Image exceeds the maximum allowed size.")
+            continue
+        yield filename, await run_io(_read_file, path)
+
+    if archive_path is None:
+        return
+
+    with zipfile.ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or os.path.basename(name).startswith("."):
+                continue
+            if not name.lower().endswith(IMAGE_EXTENSIONS) or "__MACOSX" in name:
+                continue
+            if info.file_size > PREDICT_BATCH_MAX_IMAGE_BYTES:
+                yield name, ValueError("Image exceeds the maximum allowed size.")
+                continue
+            yield name, await run_io(archive.read, info)
+
+
+async def _predict_one(index: int, filename: str, contents, user_email: str, response_mode: str) -> dict:
+    if isinstance(contents, Exception):
+        return {"index": index, "filename": filename, "status": 400, "error": str(contents)}
+    try:
+        payload, status_code = await run_prediction(contents, filename, user_email, response_mode)
+    except Exception as e:
+        print("[BATCH ERROR]", filename, str(e))
+        errors_total.inc(where="predict_batch")
+        payload, status_code = {"error": str(e)}, 500
+    return {"index": index, "filename": filename, "status": status_code, **payload}
+
+
+def _ndjson(result: dict) -> bytes:
+    return (json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+# -------------------- BATCH INFERENCE ROUTE --------------------
+@router.post("/predict/batch")
+async def predict_batch(
+    files: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    user_email: str = Form(...),
+    response_mode: str = Form("url")
+):
+    """
+    Classifies many images and streams one NDJSON line per image as it finishes.
+
+    Send the images as repeated ``files`` parts and/or one zip ``archive``.
+    Lines carry ``index`` (upload order), ``filename`` and ``status``, plus the
+    same fields /predict/ returns. Concurrent images share classifier batches.
+    """
+    response_mode = response_mode.lower()
+    if response_mode not in RESPONSE_MODES:
+        return JSONResponse(
+            content={"error": f"response_mode must be one of {', '.join(RESPONSE_MODES)}"},
+            status_code=400
+        )
+    files = files or []
+    if not files and archive is None:
+        return JSONResponse(content={"error": "Send images as 'files' or a zip 'archive'."}, status_code=400)
+    if len(files) > PREDICT_BATCH_MAX_ITEMS:
+        return JSONResponse(
+            content={"error": f"At most {PREDICT_BATCH_MAX_ITEMS} images per batch."},
+            status_code=400
+        )
+
+    workdir = tempfile.mkdtemp(prefix="predict-batch-")
+    try:
+        spooled_files = await run_io(_spool_uploads, files, workdir)
+        archive_path = None
+        if archive is not None:
+            archive_path = (await run_io(_spool_uploads, [archive], workdir))[0][1]
+            if not await run_io(zipfile.is_zipfile, archive_path):
+                shutil.rmtree(workdir, ignore_errors=True)
+                return JSONResponse(content={"error": "archive must be a zip file"}, status_code=400)
+    except Exception as e:
+        shutil.rmtree(workdir, ignore_errors=True)
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+    async def stream():
+        pending = set()
+        index = 0
+        try:
+            async for filename, contents in _iter_images(spooled_files, archive_path):
+                if index >= PREDICT_BATCH_MAX_ITEMS:
+                    yield _ndjson({"index": index, "status": 400, "error": "Batch item limit reached; remaining images skipped."})
+                    break
+                # Keep a bounded window in flight; emit results as soon as they finish
+                while len(pending) >= PREDICT_BATCH_CONCURRENCY:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield _ndjson(task.result())
+                pending.add(asyncio.ensure_future(
+                    _predict_one(index, filename, contents, user_email, response_mode)
+                ))
+                index += 1
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield _ndjson(task.result())
+        except Exception as e:
+            yield _ndjson({"index": index, "status": 500, "error": str(e)})
+        finally:
+            for task in pending:
+                task.cancel()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
 from app.db.supabase import supabase
+from app.core.executor import run_io
+from app.utils.user_cache import cached_for_user
 
 router = APIRouter()
 
@@ -11,20 +13,24 @@ async def get_prediction_details(
 ):
     try:
         # Fetch prediction and verify ownership
-        response = supabase.table("predictions")\
+        query = supabase.table("predictions")\
             .select("*")\
             .eq("id", prediction_id)\
             .eq("user_email", user_email)\
-            .single()\
-            .execute()
+            .single()
+        data = await run_io(
+            cached_for_user, "prediction_details", user_email, prediction_id,
+            lambda: query.execute().data,
+            cacheable=bool,
+        )
 
-        if not response.data:
+        if not data:
             return JSONResponse(
                 content={"error": "Prediction not found or access denied"},
                 status_code=404
             )
 
-        return response.data
+        return data
 
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
\ No newline at end of file
@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+from app.core.executor import pool_stats
+from app.utils.prediction_cache import prediction_cache
+from app.utils.gemini_description import description_cache, inflight_descriptions
+from app.utils.yolo_cropper import cascade_stats
+from app.utils.art_gate import gate_stats
+from app.utils.supabase_helpers import prediction_writer
+from app.utils.gallery_store import gallery_store
+from app.utils.user_cache import user_cache
+
+router = APIRouter()
+
+# -------------------- EXECUTOR STATS ROUTE --------------------
+@router.get("/stats/executors")
+async def executor_stats():
+    return pool_stats()
+
+
+# -------------------- CACHE STATS ROUTE --------------------
+@router.get("/stats/caches")
+async def cache_stats():
+    return {
+        "predictions": prediction_cache.stats() if prediction_cache is not None else None,
+        "descriptions": {**description_cache.stats(), "in_flight": inflight_descriptions()},
+        "galleries": gallery_store.stats(),
+        "user_data": user_cache.stats() if user_cache is not None else None,
+    }
+
+
+# -------------------- DETECTOR CASCADE STATS ROUTE --------------------
+@router.get("/stats/detector")
+async def detector_stats():
+    return cascade_stats.stats()
+
+
+# -------------------- ART GATE STATS ROUTE --------------------
+@router.get("/stats/art-gate")
+async def art_gate_stats():
+    return gate_stats.stats()
+
+
+# -------------------- PERSISTENCE QUEUE STATS ROUTE --------------------
+@router.get("/stats/persistence")
+async def persistence_stats():
+    return prediction_writer.stats() if prediction_writer is not None else {"write_behind": False}
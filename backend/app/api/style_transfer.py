@@ -14,6 +14,11 @@ from PIL import Image
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import StreamingResponse
 
+from app.core.executor import run_io, run_cpu
+from app.core.weights import load_state_dict, build_with_weights, safetensors_path
+from app.core.inference_pool import inference_pool
+from app.core.profiler import forward_profiler
+from app.core.metrics import stage, cache_hits_total, cache_misses_total, errors_total
 
 
 router = APIRouter()
@@ -113,23 +118,39 @@ def _clean_state_dict(sd: Dict[str, Any]) -> Dict[str, Any]:
             sd.pop(k)
     return sd
 
+def style_model_exists(style_name: str) -> bool:
+    pth = os.path.join(MODEL_DIR, f"{style_name}.pth")
+    return os.path.exists(pth) or os.path.exists(safetensors_path(pth))
+
 def load_style_model(style_name: str) -> nn.Module:
     pth = os.path.join(MODEL_DIR, f"{style_name}.pth")
-    if not os.path.exists(pth):
+    if not style_model_exists(style_name):
         raise FileNotFoundError(f"Model file not found: {pth}")
-    sd = torch.load(pth, map_location=DEVICE)
+    sd = load_state_dict(pth)
     if isinstance(sd, dict) and "state_dict" in sd:
         sd = sd["state_dict"]
     sd = _clean_state_dict(sd)
 
-    model = TransformerNet().to(DEVICE)
-    model.load_state_dict(sd, strict=False)
-    model.eval()
-    return model
+    return build_with_weights(TransformerNet, sd, DEVICE, strict=False)
 
 # ------------------ Cache ------------------
 MODEL_CACHE: Dict[str, nn.Module] = {}
 
+# ------------------ Inference ------------------
+def prepare_content(data: bytes) -> torch.Tensor:
+    img = Image.open(io.BytesIO(data)).convert("RGB")
+    return INPUT_TF(img).unsqueeze(0)
+
+def run_style_model(model: nn.Module, content: torch.Tensor) -> torch.Tensor:
+    with torch.no_grad():
+        return forward_profiler.run("style", model, content.to(DEVICE)).clamp(0.0, 255.0).cpu()
+
+def encode_output(output: torch.Tensor) -> bytes:
+    out_pil = tensor_to_pil(output)
+    buf = io.BytesIO()
+    out_pil.save(buf, format="JPEG", quality=95)
+    return buf.getvalue()
+
 # ------------------ Endpoints ------------------
 @router.get("/styles")
 def list_styles():
@@ -166,24 +187,32 @@ async def transfer_style(
     style_name: str = Form(...)
 ):
     try:
-        # Load model (with caching)
-        if style_name not in MODEL_CACHE:
-            MODEL_CACHE[style_name] = load_style_model(style_name)
-        model = MODEL_CACHE[style_name]
-
-        # Process image
-        img = Image.open(image.file).convert("RGB")
-        content = INPUT_TF(img).unsqueeze(0).to(DEVICE)
-
-        with torch.no_grad():
-            output = model(content).clamp(0.0, 255.0)
-
-        # Convert to PIL and return
-        out_pil = tensor_to_pil(output)
-        buf = io.BytesIO()
-        out_pil.save(buf, format="JPEG", quality=95)
-        buf.seek(0)
-        
+        if not style_model_exists(style_name):
+            raise FileNotFoundError(style_name)
+
+        # Process image off the event loop
+        data = await image.read()
+        with stage("decode"):
+            content = await run_cpu(prepare_content, data)
+
+        if inference_pool.enabled:
+            # The style net lives in an inference worker
+            with stage("style_forward"):
+                output = await inference_pool.submit("style", content, style_name=style_name)
+        else:
+            # Load model (with caching)
+            if style_name not in MODEL_CACHE:
+                cache_misses_total.inc(cache="style_model")
+                with stage("style_model_load"):
+                    MODEL_CACHE[style_name] = await run_io(load_style_model, style_name)
+            else:
+                cache_hits_total.inc(cache="style_model")
+            with stage("style_forward"):
+                output = await run_cpu(run_style_model, MODEL_CACHE[style_name], content)
+
+        with stage("encode"):
+            buf = io.BytesIO(await run_cpu(encode_output, output))
+
         filename = f"styled_{style_name}_{uuid.uuid4().hex[:8]}.jpg"
         return StreamingResponse(
             buf, 
@@ -195,4 +224,5 @@ async def transfer_style(
         raise HTTPException(status_code=404, detail=f"Style model not found: {style_name}")
     except Exception as e:
         log.exception("Style transfer failed")
+        errors_total.inc(where="transfer_style")
         raise HTTPException(status_code=500, detail=f"Style transfer failed: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Callable, List, Tuple
+
+import torch
+
+from app.core.config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from app.core.executor import run_cpu
+from app.core.engine import create_engine
+from app.core.lifecycle import models
+from app.core.profiler import forward_profiler
+from app.core.inference_pool import inference_pool
+
+
+# -------------------- MICRO-BATCHER --------------------
+class MicroBatcher:
+    """
+    Collects single-image requests into batches for one forward pass.
+
+    Callers ``await submit(tensor)`` with a (C, H, W) input and get back
+    their own top-k ``(indices, scores)``. A batch is flushed when it
+    reaches ``max_batch_size`` or ``max_wait_ms`` after its first item.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[torch.Tensor], torch.Tensor],
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+        top_k: int = 3,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.top_k = top_k
+        self._queue = None
+        self._worker = None
+
+    def _ensure_worker(self):
+        # The queue and worker are bound to the running loop, so create them lazily.
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, input_tensor: torch.Tensor) -> Tuple[List[int], List[float]]:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((input_tensor, future))
+        return await future
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already waiting before sleeping on the queue.
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    def _forward(self, tensors: List[torch.Tensor]):
+        probs = self.predict_fn(torch.stack(tensors))
+        topk = torch.topk(probs, k=min(self.top_k, probs.shape[1]), dim=1)
+        return topk.indices.tolist(), topk.values.tolist()
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Drop callers that went away while queued.
+            batch = [(t, f) for t, f in batch if not f.done()]
+            if not batch:
+                continue
+
+            try:
+                indices, scores = await run_cpu(self._forward, [t for t, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), idx, sc in zip(batch, indices, scores):
+                if not future.done():
+                    future.set_result((idx, sc))
+
+
+# -------------------- CLASSIFIER BATCHER --------------------
+def _load_classifier():
+    engine = create_engine()
+    print(f"[ENGINE] Serving the classifier with the {engine.name} engine.")
+    return engine
+
+
+def _warmup_classifier(engine):
+    for batch_size in (1, BATCH_MAX_SIZE):
+        engine.predict(torch.zeros(batch_size, 3, 224, 224))
+
+
+models.register("classifier", _load_classifier, _warmup_classifier)
+
+
+def _classify(batch: torch.Tensor) -> torch.Tensor:
+    if inference_pool.enabled:
+        return inference_pool.call("classify", batch)
+    return forward_profiler.run("classifier", models.get("classifier").predict, batch)
+
+
+classifier_batcher = MicroBatcher(_classify)
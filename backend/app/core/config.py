@@ -10,3 +10,208 @@ MODEL_PATH = os.path.normpath(os.path.join(BASE_DIR, "..", "models", "best_model
 CLASS_NAMES_PATH = os.path.normpath(os.path.join(BASE_DIR, "class_names.json"))
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# -------------------- MICRO-BATCHING --------------------
+# Concurrent /predict/ calls are grouped into one forward pass of up to
+# BATCH_MAX_SIZE images, waiting at most BATCH_MAX_WAIT_MS for stragglers.
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+# -------------------- EXECUTION POOLS --------------------
+# Blocking work is kept off the event loop: network/DB calls go to the I/O
+# pool, torch and image processing go to the CPU pool. *_CONCURRENCY caps how
+# many jobs may be submitted at once; the rest wait (and show up as queued).
+IO_POOL_WORKERS = int(os.getenv("IO_POOL_WORKERS", "16"))
+IO_POOL_CONCURRENCY = int(os.getenv("IO_POOL_CONCURRENCY", "64"))
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+CPU_POOL_CONCURRENCY = int(os.getenv("CPU_POOL_CONCURRENCY", str(CPU_POOL_WORKERS * 2)))
+
+# -------------------- CLIP PROMPT BANK --------------------
+# Encoded prompt embeddings are cached here, keyed by model and prompt-set hash.
+PROMPT_BANK_DIR = os.getenv(
+    "PROMPT_BANK_DIR", os.path.normpath(os.path.join(BASE_DIR, "..", "models", "prompt_bank"))
+)
+# Optional JSON file {"art": [...], "non_art": [...]} that overrides the built-in
+# prompts. It is re-read when its mtime changes, so prompt sets can be swapped live.
+CLIP_PROMPTS_PATH = os.getenv("CLIP_PROMPTS_PATH")
+CLIP_PROMPTS_CHECK_SECONDS = float(os.getenv("CLIP_PROMPTS_CHECK_SECONDS", "5"))
+
+# -------------------- LOCAL CACHES --------------------
+# Persistent local caches (SQLite files) live here.
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.normpath(os.path.join(BASE_DIR, "..", "..", ".cache")))
+
+# Results for byte-identical re-uploads: crop box, art verdict, top-3, description.
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "1") == "1"
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "2048"))
+PREDICTION_CACHE_DISK_SIZE = int(os.getenv("PREDICTION_CACHE_DISK_SIZE", "100000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+PREDICTION_CACHE_PATH = os.getenv("PREDICTION_CACHE_PATH", os.path.join(CACHE_DIR, "predictions.sqlite3"))
+
+# -------------------- GEMINI DESCRIPTIONS --------------------
+# Descriptions are cached by (image hash, style, prompt version). Bump the
+# prompt version whenever the prompt text changes to invalidate old entries.
+DESCRIPTION_PROMPT_VERSION = os.getenv("DESCRIPTION_PROMPT_VERSION", "v1")
+DESCRIPTION_CACHE_SIZE = int(os.getenv("DESCRIPTION_CACHE_SIZE", "4096"))
+DESCRIPTION_CACHE_DISK_SIZE = int(os.getenv("DESCRIPTION_CACHE_DISK_SIZE", "100000"))
+DESCRIPTION_CACHE_TTL_SECONDS = float(os.getenv("DESCRIPTION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+DESCRIPTION_CACHE_PATH = os.getenv("DESCRIPTION_CACHE_PATH", os.path.join(CACHE_DIR, "descriptions.sqlite3"))
+# At most this many Gemini calls are outstanding; callers wait at most
+# GEMINI_TIMEOUT_SECONDS (including that wait) before the template text is used.
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "8"))
+# Use an offline stand-in for Gemini (load tests, local development).
+GEMINI_FAKE = os.getenv("GEMINI_FAKE", "0") == "1"
+GEMINI_FAKE_LATENCY_MS = float(os.getenv("GEMINI_FAKE_LATENCY_MS", "800"))
+
+# -------------------- INFERENCE ENGINE --------------------
+# "torch" runs the classifier in eager PyTorch, "onnx" runs the exported graph
+# on ONNX Runtime (export with `python -m app.tools.export_onnx`).
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "torch").lower()
+ONNX_MODEL_PATH = os.getenv(
+    "ONNX_MODEL_PATH", os.path.normpath(os.path.join(BASE_DIR, "..", "models", "best_model.onnx"))
+)
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))  # 0 = ORT default
+
+# -------------------- QUANTIZED CLASSIFIER --------------------
+# MODEL_VARIANT=int8 serves a quantized TorchScript artifact built by
+# `python -m app.tools.quantize`. QUANTIZED_MODEL_PATH pins a specific artifact;
+# otherwise the newest one in QUANTIZED_MODEL_DIR that passed its report gate is used.
+MODEL_VARIANT = os.getenv("MODEL_VARIANT", "fp32").lower()
+QUANTIZED_MODEL_DIR = os.getenv(
+    "QUANTIZED_MODEL_DIR", os.path.normpath(os.path.join(BASE_DIR, "..", "models", "quantized"))
+)
+QUANTIZED_MODEL_PATH = os.getenv("QUANTIZED_MODEL_PATH")
+
+# -------------------- PREPROCESSING --------------------
+# Model inputs are decoded once, downscaled so the longest side is at most
+# this. JPEGs are reduced during decode (PIL draft mode), which is much
+# cheaper than decoding full phone-camera resolution and resizing afterwards.
+# The stored copy of an accepted painting keeps its original resolution.
+DECODE_MAX_SIDE = int(os.getenv("DECODE_MAX_SIDE", "2048"))
+
+# -------------------- RESPONSE ENCODING --------------------
+# /predict/ response_mode: "url" (no inline image), "thumbnail" (small inline
+# preview) or "full" (inline copy of the stored JPEG).
+PREDICT_RESPONSE_MODE = os.getenv("PREDICT_RESPONSE_MODE", "full").lower()
+JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", "75"))  # PIL default
+THUMBNAIL_MAX_SIDE = int(os.getenv("THUMBNAIL_MAX_SIDE", "320"))
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "70"))
+
+# -------------------- BATCH PREDICTION --------------------
+# /predict/batch keeps at most PREDICT_BATCH_CONCURRENCY images in flight, so
+# memory stays bounded regardless of how many files or archive entries arrive.
+PREDICT_BATCH_CONCURRENCY = int(os.getenv("PREDICT_BATCH_CONCURRENCY", "8"))
+PREDICT_BATCH_MAX_ITEMS = int(os.getenv("PREDICT_BATCH_MAX_ITEMS", "5000"))
+PREDICT_BATCH_MAX_IMAGE_BYTES = int(os.getenv("PREDICT_BATCH_MAX_IMAGE_BYTES", str(25 * 2**20)))
+
+# -------------------- MODEL LIFECYCLE --------------------
+# "background": start serving immediately and load + warm models in a startup
+# task (/readyz turns 200 when done); "eager": finish warmup before serving;
+# "lazy": load each model on first use only.
+MODEL_LOADING = os.getenv("MODEL_LOADING", "background").lower()
+
+# -------------------- WEIGHT FILES --------------------
+# "auto" prefers a sibling .safetensors file (memory-mapped, shared through the
+# page cache by every worker) and falls back to the .pth; "pickle" always
+# uses torch.load. Convert with `python -m app.tools.convert_safetensors`.
+WEIGHTS_FORMAT = os.getenv("WEIGHTS_FORMAT", "auto").lower()
+CLIP_WEIGHTS_PATH = os.getenv(
+    "CLIP_WEIGHTS_PATH", os.path.normpath(os.path.join(BASE_DIR, "..", "models", "clip_vit_b32_openai.safetensors"))
+)
+
+# -------------------- INFERENCE WORKERS --------------------
+# With INFERENCE_WORKERS > 0 the API process holds no models: YOLO, CLIP, the
+# classifier and style nets run in that many dedicated worker processes, and
+# tensors travel through shared memory. 0 keeps inference in-process.
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "60"))
+INFERENCE_HEALTH_INTERVAL_SECONDS = float(os.getenv("INFERENCE_HEALTH_INTERVAL_SECONDS", "1"))
+
+# -------------------- YOLO CASCADE --------------------
+# Most uploads are already tight scans, so detection runs as a cascade:
+#   1. border check on a tiny thumbnail: content reaching the edges → no crop;
+#   2. YOLO at YOLO_CASCADE_IMGSZ: a box covering YOLO_CASCADE_COVERAGE of the
+#      frame is accepted as-is;
+#   3. otherwise YOLO at YOLO_IMGSZ for a precise box.
+YOLO_IMGSZ = int(os.getenv("YOLO_IMGSZ", "640"))
+YOLO_CONF = float(os.getenv("YOLO_CONF", "0.05"))
+YOLO_CASCADE = os.getenv("YOLO_CASCADE", "1") == "1"
+YOLO_CASCADE_IMGSZ = int(os.getenv("YOLO_CASCADE_IMGSZ", "320"))
+YOLO_CASCADE_COVERAGE = float(os.getenv("YOLO_CASCADE_COVERAGE", "0.9"))
+# Border check: fraction of the thumbnail treated as border, minimum colour
+# std-dev (0-255) and minimum border/interior edge-density ratio for "tight".
+BORDER_FRACTION = float(os.getenv("BORDER_FRACTION", "0.08"))
+BORDER_MIN_STD = float(os.getenv("BORDER_MIN_STD", "20"))
+BORDER_EDGE_RATIO = float(os.getenv("BORDER_EDGE_RATIO", "0.6"))
+
+# -------------------- ART GATE --------------------
+# The ResNet18 art filter answers confident cases on its own; only
+# probabilities between ART_GATE_LOW and ART_GATE_HIGH go on to CLIP.
+ART_FILTER_PATH = os.getenv(
+    "ART_FILTER_PATH", os.path.normpath(os.path.join(BASE_DIR, "..", "models", "art_filter.pth"))
+)
+ART_GATE_ENABLED = os.getenv("ART_GATE_ENABLED", "1") == "1"
+ART_GATE_HIGH = float(os.getenv("ART_GATE_HIGH", "0.95"))
+ART_GATE_LOW = float(os.getenv("ART_GATE_LOW", "0.05"))
+
+# -------------------- PROFILER --------------------
+# POST /admin/profile arms torch.profiler for the next N forward passes of a
+# model; requests must carry the X-Admin-Token header. Unset ADMIN_TOKEN
+# disables the admin routes.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(CACHE_DIR, "profiles"))
+PROFILE_MAX_PASSES = int(os.getenv("PROFILE_MAX_PASSES", "50"))
+
+# -------------------- TRAFFIC CAPTURE --------------------
+# Set TRAFFIC_CAPTURE_PATH to append one JSONL record per request (shape,
+# sizes, image dimensions, content hashes, timing, status; never the image
+# bytes or raw emails). Replay with `python -m benchmarks.replay`.
+TRAFFIC_CAPTURE_PATH = os.getenv("TRAFFIC_CAPTURE_PATH")
+TRAFFIC_CAPTURE_SAMPLE = float(os.getenv("TRAFFIC_CAPTURE_SAMPLE", "1.0"))
+TRAFFIC_CAPTURE_MAX_BODY_BYTES = int(os.getenv("TRAFFIC_CAPTURE_MAX_BODY_BYTES", str(64 * 1024 * 1024)))
+TRAFFIC_CAPTURE_QUEUE_SIZE = int(os.getenv("TRAFFIC_CAPTURE_QUEUE_SIZE", "1000"))
+# Request bodies waiting to be parsed are held in memory; past this many
+# bytes in total, new captures are dropped (and counted) instead.
+TRAFFIC_CAPTURE_QUEUE_BYTES = int(os.getenv("TRAFFIC_CAPTURE_QUEUE_BYTES", str(256 * 1024 * 1024)))
+
+# -------------------- PREDICTION PERSISTENCE --------------------
+# Write-behind: save_prediction appends to a local spool and returns; a
+# background thread bulk-inserts batches of up to PREDICTION_FLUSH_MAX_ROWS
+# every PREDICTION_FLUSH_INTERVAL_SECONDS. Each worker process spools into
+# its own subdirectory; rows left by a dead worker are adopted and re-sent on
+# the next start (at-least-once). Rows the DB rejects for good go to
+# dead-letter.jsonl in PREDICTION_SPOOL_DIR.
+PREDICTION_WRITE_BEHIND = os.getenv("PREDICTION_WRITE_BEHIND", "1") == "1"
+PREDICTION_SPOOL_DIR = os.getenv("PREDICTION_SPOOL_DIR", os.path.join(CACHE_DIR, "prediction_spool"))
+PREDICTION_FLUSH_MAX_ROWS = int(os.getenv("PREDICTION_FLUSH_MAX_ROWS", "50"))
+PREDICTION_FLUSH_INTERVAL_SECONDS = float(os.getenv("PREDICTION_FLUSH_INTERVAL_SECONDS", "0.5"))
+PREDICTION_SPOOL_FSYNC = os.getenv("PREDICTION_SPOOL_FSYNC", "0") == "1"
+KNOWN_USERS_CACHE_SIZE = int(os.getenv("KNOWN_USERS_CACHE_SIZE", "10000"))
+
+# -------------------- HISTORY PAGINATION --------------------
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "200"))
+
+# -------------------- GALLERY --------------------
+# Per-user galleries are materialized and updated as predictions are saved
+# or deleted: an in-memory LRU in front of a local SQLite copy that the
+# workers on one host share (memory copies are checked against its version
+# on every read). The TTLs bound drift from rows changed outside this API.
+GALLERY_CACHE_USERS = int(os.getenv("GALLERY_CACHE_USERS", "1000"))
+GALLERY_MEMORY_TTL_SECONDS = float(os.getenv("GALLERY_MEMORY_TTL_SECONDS", "300"))
+GALLERY_STORE_TTL_SECONDS = float(os.getenv("GALLERY_STORE_TTL_SECONDS", str(24 * 3600)))
+GALLERY_STORE_MAX_USERS = int(os.getenv("GALLERY_STORE_MAX_USERS", "100000"))
+GALLERY_STORE_PATH = os.getenv("GALLERY_STORE_PATH", os.path.join(CACHE_DIR, "galleries.sqlite3"))
+
+# -------------------- USER DATA CACHE --------------------
+# Read-through cache under /history/ and /prediction-details/, invalidated
+# per user when they predict or delete. /gallery/ is served by the
+# materialized gallery store instead (GALLERY_*). Backends: "memory"
+# (per process), "sqlite" (shared by the workers on one host) or "redis"
+# (shared across hosts; needs the redis package and USER_CACHE_REDIS_URL).
+USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "1") == "1"
+USER_CACHE_BACKEND = os.getenv("USER_CACHE_BACKEND", "memory")
+USER_CACHE_MAX_BYTES = int(os.getenv("USER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+USER_CACHE_PATH = os.getenv("USER_CACHE_PATH", os.path.join(CACHE_DIR, "user_cache.sqlite3"))
+USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL")
@@ -0,0 +1,55 @@
+import numpy as np
+import torch
+import torch.nn as nn
+
+from app.core.model_loader import load_model, load_quantized_model
+from app.core.config import INFERENCE_ENGINE, ONNX_MODEL_PATH, ONNX_INTRA_OP_THREADS, MODEL_VARIANT, device
+
+
+# -------------------- ENGINES --------------------
+# An engine takes a normalized (N, 3, 224, 224) float batch and returns
+# (N, num_classes) softmax probabilities as a CPU tensor.
+
+class TorchEngine:
+    name = "torch"
+
+    def __init__(self, model: nn.Module, device=device):
+        self.model = model
+        self.device = device
+
+    @torch.no_grad()
+    def predict(self, batch: torch.Tensor) -> torch.Tensor:
+        outputs = self.model(batch.to(self.device))
+        return torch.softmax(outputs, dim=1).cpu()
+
+
+class OnnxEngine:
+    name = "onnx"
+
+    def __init__(self, onnx_path: str = ONNX_MODEL_PATH, intra_op_threads: int = ONNX_INTRA_OP_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.session = ort.InferenceSession(
+            onnx_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: torch.Tensor) -> torch.Tensor:
+        inputs = np.ascontiguousarray(batch.detach().cpu().numpy(), dtype=np.float32)
+        logits = self.session.run(None, {self.input_name: inputs})[0]
+        return torch.softmax(torch.from_numpy(logits), dim=1)
+
+
+def create_engine(kind: str = INFERENCE_ENGINE):
+    if kind == "torch":
+        if MODEL_VARIANT == "int8":
+            return TorchEngine(load_quantized_model(), device=torch.device("cpu"))
+        return TorchEngine(load_model())
+    if kind == "onnx":
+        return OnnxEngine()
+    raise ValueError(f"Unknown INFERENCE_ENGINE: {kind!r} (expected 'torch' or 'onnx')")
@@ -0,0 +1,95 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.core.config import (
+    IO_POOL_WORKERS, IO_POOL_CONCURRENCY,
+    CPU_POOL_WORKERS, CPU_POOL_CONCURRENCY,
+)
+
+
+# -------------------- BOUNDED POOL --------------------
+class BoundedPool:
+    """
+    A thread pool that limits how many jobs can be outstanding at once.
+
+    ``await pool.run(fn, *args)`` runs ``fn`` on a worker thread. Callers
+    beyond ``max_concurrency`` wait on a semaphore instead of piling up
+    inside the executor, so ``stats()`` can report the real queue depth.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_concurrency: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_concurrency = max(self.max_workers, max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=f"{name}-pool"
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _add(self, field: str, delta: int):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+
+        self._add("_waiting", 1)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._add("_waiting", -1)
+
+        self._add("_active", 1)
+        try:
+            result = await loop.run_in_executor(self._executor, call)
+        except BaseException:
+            self._add("_failed", 1)
+            raise
+        else:
+            self._add("_completed", 1)
+            return result
+        finally:
+            self._add("_active", -1)
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "queued": self._waiting,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# -------------------- SHARED POOLS --------------------
+io_pool = BoundedPool("io", IO_POOL_WORKERS, IO_POOL_CONCURRENCY)
+cpu_pool = BoundedPool("cpu", CPU_POOL_WORKERS, CPU_POOL_CONCURRENCY)
+
+
+async def run_io(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking network/DB call (Supabase, Gemini) on the I/O pool."""
+    return await io_pool.run(fn, *args, **kwargs)
+
+
+async def run_cpu(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run torch inference or image processing on the CPU pool."""
+    return await cpu_pool.run(fn, *args, **kwargs)
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    return {pool.name: pool.stats() for pool in (io_pool, cpu_pool)}
@@ -0,0 +1,389 @@
+import asyncio
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+import numpy as np
+import torch
+
+from app.core.config import (
+    INFERENCE_WORKERS, INFERENCE_TIMEOUT_SECONDS, INFERENCE_HEALTH_INTERVAL_SECONDS,
+)
+
+
+# -------------------- SHARED MEMORY TRANSPORT --------------------
+# Spawned workers inherit the API process's resource tracker, so one tracker
+# sees every block: creating a block registers it and unlink() unregisters
+# it, whichever process does each. Nothing else may unregister, or the later
+# unlink() makes the tracker log a KeyError; a block whose unlink never comes
+# (e.g. its worker crashed) is cleaned up by the tracker at shutdown.
+def _to_shared(tensor: torch.Tensor):
+    """Copies a tensor into a new shared-memory block; returns (block, descriptor)."""
+    array = tensor.detach().cpu().contiguous().numpy()
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, str(array.dtype))
+
+
+def _from_shared(descriptor) -> torch.Tensor:
+    name, shape, dtype = descriptor
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        return torch.from_numpy(array.copy())
+    finally:
+        block.close()
+
+
+# -------------------- WORKER PROCESS --------------------
+_style_models: Dict[str, Any] = {}
+
+
+def _run_task(task: str, tensor: torch.Tensor, kwargs: Dict[str, Any]):
+    from app.core.lifecycle import models
+    if task == "classify":
+        return models.get("classifier").predict(tensor)
+    if task == "clip":
+        from app.utils.clip_filter import is_art_clip
+        return bool(is_art_clip(tensor))
+    if task == "profile":
+        from app.core.profiler import forward_profiler
+        action = kwargs.pop("action")
+        if action == "arm":
+            return forward_profiler.arm(**kwargs)
+        if action == "disarm":
+            return forward_profiler.disarm(**kwargs)
+        return forward_profiler.status()
+    if task == "art_filter":
+        from app.utils.art_filter import art_probability
+        return art_probability(tensor)
+    if task == "yolo":
+        from app.utils.yolo_cropper import run_detector
+        return run_detector(tensor)
+    if task == "style":
+        from app.api.style_transfer import load_style_model, run_style_model
+        name = kwargs["style_name"]
+        if name not in _style_models:
+            _style_models[name] = load_style_model(name)
+        return run_style_model(_style_models[name], tensor)
+    raise ValueError(f"Unknown inference task: {task}")
+
+
+def _worker_main(worker_id: int, requests: mp.Queue, results: mp.Queue):
+    # Importing these registers the classifier, CLIP, YOLO and art-filter loaders
+    import app.core.batcher  # noqa: F401
+    import app.utils.clip_filter  # noqa: F401
+    import app.utils.yolo_cropper  # noqa: F401
+    import app.utils.art_filter  # noqa: F401
+    from app.core.lifecycle import models
+
+    models.warmup_blocking()
+    results.put((None, worker_id, "ready", models.status()))
+
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        request_id, task, descriptor, kwargs = message
+        try:
+            output = _run_task(task, _from_shared(descriptor), kwargs)
+            if isinstance(output, torch.Tensor):
+                block, out_descriptor = _to_shared(output)
+                block.close()
+                # The API process unlinks it after reading
+                results.put((request_id, worker_id, "tensor", out_descriptor))
+            else:
+                results.put((request_id, worker_id, "value", output))
+        except Exception as e:
+            results.put((request_id, worker_id, "error", f"{type(e).__name__}: {e}"))
+
+
+# -------------------- POOL --------------------
+class InferencePool:
+    """
+    N model-owning worker processes fed through shared memory.
+
+    API code calls ``await submit(task, tensor, **kwargs)`` (or the blocking
+    ``call``). Input tensors are copied into a shared-memory block and only
+    its name goes over the queue; tensor results come back the same way. A
+    monitor thread restarts crashed workers and fails their in-flight
+    requests so callers don't hang.
+    """
+
+    def __init__(self, num_workers: int = INFERENCE_WORKERS,
+                 timeout: float = INFERENCE_TIMEOUT_SECONDS,
+                 health_interval: float = INFERENCE_HEALTH_INTERVAL_SECONDS):
+        self.num_workers = num_workers
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self._ctx = mp.get_context("spawn")
+        self._results = None
+        self._workers: Dict[int, Dict[str, Any]] = {}
+        self._pending: Dict[int, tuple] = {}  # request_id -> (future, worker_id, input block)
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._started = False
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._started
+
+    def start(self):
+        if self._started or self.num_workers <= 0:
+            return
+        self._results = self._ctx.Queue()
+        for worker_id in range(self.num_workers):
+            self._spawn(worker_id)
+        threading.Thread(target=self._collect_results, name="inference-results", daemon=True).start()
+        threading.Thread(target=self._monitor, name="inference-monitor", daemon=True).start()
+        self._started = True
+        print(f"[INFERENCE] Started {self.num_workers} worker process(es).")
+
+    def _spawn(self, worker_id: int):
+        requests = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main, args=(worker_id, requests, self._results),
+            name=f"inference-worker-{worker_id}", daemon=True,
+        )
+        process.start()
+        with self._lock:
+            previous = self._workers.get(worker_id, {})
+            self._workers[worker_id] = {
+                "process": process,
+                "requests": requests,
+                "ready": False,
+                "models": None,
+                "started_at": time.time(),
+                "restarts": previous.get("restarts", -1) + 1,
+            }
+
+    def _collect_results(self):
+        while not self._stopping.is_set():
+            try:
+                request_id, worker_id, kind, payload = self._results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            if kind == "ready":
+                with self._lock:
+                    worker = self._workers.get(worker_id)
+                    if worker is not None:
+                        worker["ready"], worker["models"] = True, payload
+                continue
+
+            with self._lock:
+                entry = self._pending.pop(request_id, None)
+            if entry is None:
+                # Caller timed out; still release a returned tensor block
+                if kind == "tensor":
+                    self._unlink(payload[0])
+                continue
+            future, _, block = entry
+            self._release(block)
+
+            if kind == "error":
+                self._count("failed")
+                self._settle(future, error=RuntimeError(payload))
+                continue
+            try:
+                if kind == "tensor":
+                    value = _from_shared(payload)
+                    self._unlink(payload[0])
+                else:
+                    value = payload
+                self._count("completed")
+                self._settle(future, value=value)
+            except Exception as e:
+                self._count("failed")
+                self._settle(future, error=e)
+
+    @staticmethod
+    def _settle(future: Future, value: Any = None, error: Optional[BaseException] = None):
+        """Resolves ``future`` unless its caller already gave up on it (cancelled)."""
+        if future.done():
+            return
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+        except InvalidStateError:
+            pass  # cancelled between the check and the set
+
+    def _count(self, field: str, amount: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def _monitor(self):
+        while not self._stopping.wait(self.health_interval):
+            with self._lock:
+                workers = list(self._workers.items())
+            for worker_id, worker in workers:
+                if worker["process"].is_alive():
+                    continue
+                print(f"[INFERENCE] Worker {worker_id} died (exit code {worker['process'].exitcode}); restarting.")
+                self._fail_pending(worker_id, RuntimeError("Inference worker crashed"))
+                self._spawn(worker_id)
+
+    def _fail_pending(self, worker_id: int, error: Exception):
+        with self._lock:
+            lost = [rid for rid, (_, wid, _) in self._pending.items() if wid == worker_id]
+            entries = [self._pending.pop(rid) for rid in lost]
+            self.failed += len(entries)
+        for future, _, block in entries:
+            self._release(block)
+            self._settle(future, error=error)
+
+    @staticmethod
+    def _release(block: shared_memory.SharedMemory):
+        block.close()
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _unlink(name: str):
+        try:
+            block = shared_memory.SharedMemory(name=name)
+            block.close()
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _pick_worker(self) -> int:
+        with self._lock:
+            load = {wid: 0 for wid, w in self._workers.items() if w["process"].is_alive()}
+            if not load:
+                raise RuntimeError("No inference workers are alive")
+            for _, wid, _ in self._pending.values():
+                if wid in load:
+                    load[wid] += 1
+        return min(load, key=load.get)
+
+    def _dispatch(self, task: str, tensor: torch.Tensor, kwargs: Dict[str, Any],
+                  worker_id: Optional[int] = None) -> Future:
+        if not self._started:
+            raise RuntimeError("Inference pool is not running")
+        future = Future()
+        if worker_id is None:
+            worker_id = self._pick_worker()
+        block, descriptor = _to_shared(tensor)
+        request_id = next(self._ids)
+        with self._lock:
+            self._pending[request_id] = (future, worker_id, block)
+            requests = self._workers[worker_id]["requests"]
+        requests.put((request_id, task, descriptor, kwargs))
+        future.request_id = request_id
+        return future
+
+    def _abandon(self, future: Future):
+        with self._lock:
+            entry = self._pending.pop(future.request_id, None)
+        if entry is not None:
+            self._release(entry[2])
+
+    def call(self, task: str, tensor: torch.Tensor, **kwargs) -> Any:
+        """Blocking submit, for code already running on a worker thread."""
+        future = self._dispatch(task, tensor, kwargs)
+        try:
+            return future.result(timeout=self.timeout)
+        finally:
+            # No-op once the collector has popped it; frees the entry on timeout
+            self._abandon(future)
+
+    async def submit(self, task: str, tensor: torch.Tensor, **kwargs) -> Any:
+        future = self._dispatch(task, tensor, kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        finally:
+            # Also on cancellation (client went away), which cancels ``future`` too
+            self._abandon(future)
+
+    async def broadcast(self, task: str, **kwargs) -> Dict[int, Any]:
+        """Runs a control task (no tensor payload) once on every live worker."""
+        with self._lock:
+            alive = [wid for wid, w in self._workers.items() if w["process"].is_alive()]
+        futures = [self._dispatch(task, torch.zeros(1), dict(kwargs), worker_id=wid) for wid in alive]
+        try:
+            results = await asyncio.gather(
+                *(asyncio.wait_for(asyncio.wrap_future(f), self.timeout) for f in futures),
+                return_exceptions=True,
+            )
+        finally:
+            for future in futures:
+                self._abandon(future)
+        return {
+            wid: {"error": str(result)} if isinstance(result, BaseException) else result
+            for wid, result in zip(alive, results)
+        }
+
+    def ready(self) -> bool:
+        with self._lock:
+            workers = list(self._workers.values())
+        return self._started and all(w["ready"] and w["process"].is_alive() for w in workers)
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            pending_by_worker = {}
+            for _, wid, _ in self._pending.values():
+                pending_by_worker[wid] = pending_by_worker.get(wid, 0) + 1
+            workers = {wid: dict(w) for wid, w in self._workers.items()}
+            completed, failed = self.completed, self.failed
+        return {
+            "ready": self.ready(),
+            "completed": completed,
+            "failed": failed,
+            "workers": {
+                wid: {
+                    "pid": w["process"].pid,
+                    "alive": w["process"].is_alive(),
+                    "ready": w["ready"],
+                    "restarts": w["restarts"],
+                    "pending": pending_by_worker.get(wid, 0),
+                    "models": w["models"],
+                }
+                for wid, w in workers.items()
+            },
+        }
+
+    def stop(self):
+        if not self._started:
+            return
+        self._stopping.set()
+        with self._lock:
+            workers = list(self._workers.values())
+        for worker in workers:
+            try:
+                worker["requests"].put(None)
+            except Exception:
+                pass
+        for worker in workers:
+            worker["process"].join(timeout=5)
+            if worker["process"].is_alive():
+                worker["process"].terminate()
+        self._fail_pending_all(RuntimeError("Inference pool stopped"))
+        self._started = False
+
+    def _fail_pending_all(self, error: Exception):
+        with self._lock:
+            worker_ids = list(self._workers)
+        for worker_id in worker_ids:
+            self._fail_pending(worker_id, error)
+
+
+inference_pool = InferencePool()
@@ -0,0 +1,138 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import MODEL_LOADING
+from app.core.executor import run_cpu
+
+
+# -------------------- MODEL SLOT --------------------
+class ModelSlot:
+    """
+    One lazily loaded model: loaded on first ``get()`` or by the warmup task.
+
+    ``warmup`` receives the loaded value and runs a synthetic inference so the
+    first real request doesn't pay for lazy kernel/graph initialization.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any],
+                 warmup: Optional[Callable[[Any], None]] = None, required: bool = True):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.required = required
+        self.state = "pending"
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        if self.state == "ready":
+            return self._value
+        with self._lock:
+            if self._value is None:
+                self._load()
+        return self._value
+
+    def _load(self):
+        self.state = "loading"
+        start = time.perf_counter()
+        try:
+            self._value = self.loader()
+        except Exception as e:
+            self.state, self.error = "failed", str(e)
+            print(f"[MODELS] Failed to load {self.name}:", e)
+            raise
+        self.load_seconds = round(time.perf_counter() - start, 3)
+        self.state = "loaded"
+        print(f"[MODELS] Loaded {self.name} in {self.load_seconds}s")
+
+    def ensure_ready(self):
+        """Loads (if needed) and warms up the model; safe to call more than once."""
+        value = self.get()
+        with self._lock:
+            if self.state == "ready":
+                return
+            self.state = "warming"
+            start = time.perf_counter()
+            try:
+                if self.warmup is not None:
+                    self.warmup(value)
+            except Exception as e:
+                self.state, self.error = "failed", str(e)
+                print(f"[MODELS] Warmup failed for {self.name}:", e)
+                raise
+            self.warmup_seconds = round(time.perf_counter() - start, 3)
+            self.state = "ready"
+            print(f"[MODELS] Warmed up {self.name} in {self.warmup_seconds}s")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.error,
+        }
+
+
+# -------------------- REGISTRY --------------------
+class ModelRegistry:
+    def __init__(self, lazy: bool = False):
+        self.lazy = lazy
+        self._slots: Dict[str, ModelSlot] = {}
+        self.warmup_started_at = None
+        self.warmup_seconds = None
+
+    def register(self, name: str, loader: Callable[[], Any],
+                 warmup: Optional[Callable[[Any], None]] = None, required: bool = True) -> ModelSlot:
+        slot = ModelSlot(name, loader, warmup, required)
+        self._slots[name] = slot
+        return slot
+
+    def get(self, name: str) -> Any:
+        return self._slots[name].get()
+
+    async def warmup_all(self):
+        """Loads and warms every registered model, one at a time, on the CPU pool."""
+        self.warmup_started_at = time.time()
+        start = time.perf_counter()
+        for slot in list(self._slots.values()):
+            try:
+                await run_cpu(slot.ensure_ready)
+            except Exception:
+                continue  # recorded on the slot; /readyz reports it
+        self.warmup_seconds = round(time.perf_counter() - start, 3)
+        print(f"[MODELS] Warmup finished in {self.warmup_seconds}s")
+
+    def warmup_blocking(self):
+        """Same as ``warmup_all`` for processes without an event loop (inference workers)."""
+        start = time.perf_counter()
+        for slot in list(self._slots.values()):
+            try:
+                slot.ensure_ready()
+            except Exception:
+                continue
+        self.warmup_seconds = round(time.perf_counter() - start, 3)
+
+    def ready(self) -> bool:
+        """
+        Every required model is loaded and warmed up. In lazy mode nothing
+        loads until first use, so only a failed required model counts.
+        """
+        if self.lazy:
+            return all(slot.state != "failed" for slot in self._slots.values() if slot.required)
+        return all(slot.state == "ready" for slot in self._slots.values() if slot.required)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready(),
+            "lazy": self.lazy,
+            "warmup_seconds": self.warmup_seconds,
+            "models": {name: slot.status() for name, slot in self._slots.items()},
+        }
+
+
+models = ModelRegistry(lazy=MODEL_LOADING == "lazy")
@@ -3,7 +3,13 @@ import torch.nn as nn
 import timm
 from torchvision import transforms
 import json
-from app.core.config import MODEL_PATH, CLASS_NAMES_PATH, device
+import os
+import glob
+from app.core.weights import load_state_dict, build_with_weights
+from app.core.config import (
+    MODEL_PATH, CLASS_NAMES_PATH, device,
+    QUANTIZED_MODEL_DIR, QUANTIZED_MODEL_PATH,
+)
 
 # -------------------- LOAD CLASSES --------------------
 with open(CLASS_NAMES_PATH, "r") as f:
@@ -12,11 +18,38 @@ with open(CLASS_NAMES_PATH, "r") as f:
 num_classes = len(class_names)
 
 # -------------------- LOAD MODEL --------------------
-model = timm.create_model('efficientnet_b3', pretrained=False)
-model.classifier = nn.Linear(model.classifier.in_features, num_classes)
-model.load_state_dict(torch.load(MODEL_PATH, map_location=device))
-model.to(device)
-model.eval()
+def build_model() -> nn.Module:
+    model = timm.create_model('efficientnet_b3', pretrained=False)
+    model.classifier = nn.Linear(model.classifier.in_features, num_classes)
+    return model
+
+
+def load_model(path: str = MODEL_PATH) -> nn.Module:
+    # Prefers memory-mapped safetensors weights shared across workers
+    return build_with_weights(build_model, load_state_dict(path), device)
+
+
+# -------------------- QUANTIZED MODEL --------------------
+def latest_quantized_artifact(directory: str = QUANTIZED_MODEL_DIR) -> str:
+    """Newest artifact whose sidecar report passed the accuracy gate."""
+    for path in sorted(glob.glob(os.path.join(directory, "*.pt")), key=os.path.getmtime, reverse=True):
+        report_path = os.path.splitext(path)[0] + ".json"
+        if not os.path.exists(report_path):
+            continue
+        with open(report_path, "r") as f:
+            if json.load(f).get("passed"):
+                return path
+    raise FileNotFoundError(f"No quantized artifact with a passing report in {directory}")
+
+
+def load_quantized_model(path: str = None) -> torch.jit.ScriptModule:
+    path = path or QUANTIZED_MODEL_PATH or latest_quantized_artifact()
+    # Quantized kernels are CPU-only.
+    model = torch.jit.load(path, map_location="cpu")
+    model.eval()
+    print(f"[MODEL] Loaded quantized classifier {os.path.basename(path)}")
+    return model
+
 
 # -------------------- TRANSFORMS --------------------
 transform = transforms.Compose([
@@ -24,4 +57,4 @@ transform = transforms.Compose([
     transforms.ToTensor(),
     transforms.Normalize([0.485, 0.456, 0.406],
                          [0.229, 0.224, 0.225]),
-])
\ No newline at end of file
+])
@@ -0,0 +1,209 @@
+import asyncio
+import base64
+from datetime import datetime
+from typing import Any, Dict, Tuple
+from app.core.model_loader import class_names
+from app.core.batcher import classifier_batcher
+from app.core.executor import run_io, run_cpu
+from app.core.metrics import stage, timed, cache_hits_total, cache_misses_total, rejections_total, errors_total
+from app.utils.supabase_helpers import upload_image_to_storage, save_prediction
+from app.utils.yolo_cropper import detect_painting_box
+from app.utils.art_gate import is_art
+from app.utils.image_helpers import get_image_hash, encode_jpeg, encode_thumbnail
+from app.utils.preprocessing import (
+    decode_image, source_size, scale_box, to_uint8_tensor, crop_tensor, classifier_input,
+)
+from app.utils.prediction_cache import prediction_cache, content_digest
+from app.utils.gemini_description import describe_painting
+
+# url: no inline image, thumbnail: small inline preview, full: inline stored JPEG
+RESPONSE_MODES = ("url", "thumbnail", "full")
+
+NOT_ART_RESPONSE = {"message": "🚫 This image doesn't appear to be a painting or artwork."}
+
+
+# -------------------- STORED COPY --------------------
+def encode_stored_image(contents: bytes, image, box, decoded_size) -> bytes:
+    """
+    JPEG of the copy that is stored and shown: the original resolution,
+    cropped like the model input. ``image`` is reused when the capped decode
+    didn't shrink the upload.
+    """
+    if source_size(contents) != tuple(decoded_size):
+        full = decode_image(contents, max_side=0)
+        image = full.crop(scale_box(box, decoded_size, full.size)) if box else full
+    return encode_jpeg(image)
+
+
+# -------------------- PREDICTION PIPELINE --------------------
+async def run_prediction(
+    contents: bytes,
+    filename: str,
+    user_email: str,
+    response_mode: str = "full",
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Runs one upload through cache → YOLO → CLIP → classifier → Gemini/storage/DB.
+
+    Returns ``(payload, status_code)``; rejections come back as 400 payloads,
+    unexpected failures are raised to the caller. Shared by /predict/ and
+    /predict/batch.
+    """
+    # ✅ Repeat uploads: reuse earlier model outputs keyed by the exact bytes
+    cache_key = content_digest(contents)
+    cached = None
+    if prediction_cache is not None:
+        cached = await run_io(prediction_cache.get, cache_key)
+        if cached is not None:
+            print("[CACHE] Prediction cache hit.")
+            cache_hits_total.inc(cache="prediction")
+            if not cached["is_art"]:
+                rejections_total.inc(source="cache")
+                return dict(NOT_ART_RESPONSE), 400
+        else:
+            cache_misses_total.inc(cache="prediction")
+
+    # Reduced-size decode for the models; the stored copy is re-decoded at full size
+    with stage("decode"):
+        image = await run_cpu(decode_image, contents)
+    decoded_size = image.size
+
+    if cached is not None:
+        box = cached.get("box")
+        if box:
+            image = await run_cpu(image.crop, tuple(box))
+        top_classes = [label for label, _ in cached["predictions"]]
+        top_scores = [score for _, score in cached["predictions"]]
+    else:
+        # Single tensor conversion shared by YOLO, CLIP and the classifier
+        with stage("to_tensor"):
+            pixels = await run_cpu(to_uint8_tensor, image)
+
+        # ✅ Try YOLO cropping (optional fallback)
+        box = None
+        try:
+            with stage("yolo"):
+                box = await run_cpu(detect_painting_box, pixels)
+            image = await run_cpu(image.crop, box)
+            pixels = crop_tensor(pixels, box)
+            print("[YOLO] Cropping succeeded.")
+        except Exception as e:
+            print("[YOLO WARNING]", str(e))
+
+        print("[ART GATE] Running is_art()")
+        result = await run_cpu(is_art, pixels)
+        print("[ART GATE] Result:", result)
+
+        # ✅ Check if the image is art (ResNet18 filter, CLIP for uncertain cases)
+        if not result:
+            if prediction_cache is not None:
+                await run_io(prediction_cache.put, cache_key, {"box": box, "is_art": False})
+            rejections_total.inc(source="art_gate")
+            return dict(NOT_ART_RESPONSE), 400
+
+        # ✅ Model prediction (batched with concurrent requests)
+        with stage("classifier"):
+            input_tensor = await run_cpu(classifier_input, pixels)
+            top_indices, top_values = await classifier_batcher.submit(input_tensor)
+        top_classes = [class_names[idx] for idx in top_indices]
+        top_scores = [round(score, 4) for score in top_values]
+
+    prediction = top_classes[0]
+    confidence = top_scores[0]
+
+    timestamp = datetime.utcnow().isoformat()
+
+    # ✅ Post-classification fan-out
+    # The full-resolution JPEG is encoded once and reused for storage, Gemini
+    # and the full preview. Encoding and hashing run concurrently; Gemini waits for the
+    # bytes and the hash (its cache key), upload waits for the bytes, and
+    # the DB insert waits for the branches it needs. Latency is roughly the
+    # slowest branch.
+    image.load()  # make sure pixel data is materialized before threads share it
+
+    async def image_hash_of():
+        if cached is not None and cached.get("image_hash"):
+            return cached["image_hash"]
+        return await run_cpu(get_image_hash, image)
+
+    encode_task = asyncio.ensure_future(
+        timed("encode", run_cpu(encode_stored_image, contents, image, box, decoded_size))
+    )
+    hash_task = asyncio.ensure_future(image_hash_of())
+
+    async def describe():
+        if cached is not None:
+            return cached["description"], True
+        # ✅ Description generation (cached, deduplicated, with safe fallback)
+        try:
+            return await describe_painting(await encode_task, prediction, await hash_task)
+        except Exception as e:
+            print("[GEMINI ERROR]", str(e))
+            errors_total.inc(where="gemini")
+            return "📝 Description generation failed. Showing basic classification only.", False
+
+    async def upload():
+        # The (cropped) image bytes go to storage
+        image_bytes = await encode_task
+        with stage("storage_upload"):
+            return await run_io(upload_image_to_storage, image_bytes, filename)
+
+    async def preview():
+        # ✅ Base64 for frontend preview
+        if response_mode == "url":
+            return None
+        if response_mode == "thumbnail":
+            with stage("encode"):
+                preview_bytes = await run_cpu(encode_thumbnail, image)
+        else:
+            preview_bytes = await encode_task
+        return base64.b64encode(preview_bytes).decode("utf-8")
+
+    preview_task = asyncio.ensure_future(preview())
+    try:
+        (description, description_ok), (image_url, storage_path), image_hash = await asyncio.gather(
+            describe(),
+            upload(),
+            hash_task,
+        )
+
+        # ✅ DB logging
+        with stage("db_insert"):
+            await run_io(
+                save_prediction,
+                user_email, prediction, image_url,
+                timestamp, confidence, description,
+                storage_path, image_hash
+            )
+        img_str = await preview_task
+    finally:
+        preview_task.cancel()
+        hash_task.cancel()
+        encode_task.cancel()
+
+    if prediction_cache is not None and cached is None and description_ok:
+        await run_io(prediction_cache.put, cache_key, {
+            "box": box,
+            "is_art": True,
+            "predictions": [[label, score] for label, score in zip(top_classes, top_scores)],
+            "description": description,
+            "image_hash": image_hash,
+        })
+
+    # ✅ Construct full response
+    response_data = {
+        "filename": filename,
+        "style": prediction,
+        "confidence": confidence,
+        "predictions": list(zip(top_classes, top_scores)),
+        "image_url": image_url,
+        "description": description,
+        "timestamp": timestamp
+    }
+    if img_str is not None:
+        response_data["base64_preview"] = img_str
+
+    if confidence < 0.5:
+        response_data["warning"] = "🤔 The style of this artwork couldn't be confidently identified."
+
+    return response_data, 200
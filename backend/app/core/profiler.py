@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional
+
+import torch
+from torch.profiler import profile, ProfilerActivity
+
+from app.core.config import PROFILE_DIR, PROFILE_MAX_PASSES
+
+# Models whose forward passes can be captured
+PROFILE_TARGETS = ("classifier", "clip", "yolo", "art_filter", "style")
+
+SUMMARY_ROWS = 25
+
+# Capture metadata kept for /admin/profile; the files themselves stay on disk
+RECENT_CAPTURES = 20
+
+
+# -------------------- FORWARD PROFILER --------------------
+class ForwardProfiler:
+    """
+    Captures the next N forward passes of a model with ``torch.profiler``.
+
+    Model call sites go through ``run(target, fn, *args)``. While nothing is
+    armed that is a single dict check before calling ``fn``; once armed, each
+    pass is recorded on its own and written as a Chrome trace plus a top-ops
+    summary under PROFILE_DIR. Only one pass is profiled at a time; passes
+    that arrive while a capture is running are served unprofiled rather than
+    made to wait.
+    """
+
+    def __init__(self, output_dir: str = PROFILE_DIR):
+        self.output_dir = output_dir
+        self._armed: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._capture_lock = threading.Lock()
+        self.captures: Deque[dict] = deque(maxlen=RECENT_CAPTURES)
+
+    def arm(self, target: str, passes: int = 1, record_shapes: bool = True,
+            profile_memory: bool = True) -> dict:
+        if target not in PROFILE_TARGETS:
+            raise ValueError(f"target must be one of {', '.join(PROFILE_TARGETS)}")
+        passes = max(1, min(int(passes), PROFILE_MAX_PASSES))
+        with self._lock:
+            self._armed[target] = {
+                "remaining": passes,
+                "record_shapes": record_shapes,
+                "profile_memory": profile_memory,
+                "armed_at": datetime.utcnow().isoformat(),
+            }
+        print(f"[PROFILER] Armed {target} for {passes} forward pass(es).")
+        return self.status()
+
+    def disarm(self, target: Optional[str] = None) -> dict:
+        with self._lock:
+            if target is None:
+                self._armed.clear()
+            else:
+                self._armed.pop(target, None)
+        return self.status()
+
+    def status(self) -> dict:
+        with self._lock:
+            armed = {target: dict(options) for target, options in self._armed.items()}
+        return {"pid": os.getpid(), "armed": armed, "captures": list(self.captures)}
+
+    def _claim(self, target: str) -> Optional[dict]:
+        with self._lock:
+            options = self._armed.get(target)
+            if options is None:
+                return None
+            options["remaining"] -= 1
+            if options["remaining"] <= 0:
+                del self._armed[target]
+            return dict(options)
+
+    def run(self, target: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if not self._armed:
+            return fn(*args, **kwargs)
+        if target not in self._armed or not self._capture_lock.acquire(blocking=False):
+            return fn(*args, **kwargs)
+
+        try:
+            options = self._claim(target)
+            if options is None:
+                return fn(*args, **kwargs)
+            return self._capture(target, options, fn, *args, **kwargs)
+        finally:
+            self._capture_lock.release()
+
+    def _capture(self, target: str, options: dict, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        activities = [ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+
+        start = time.perf_counter()
+        with profile(
+            activities=activities,
+            record_shapes=options["record_shapes"],
+            profile_memory=options["profile_memory"],
+        ) as prof:
+            result = fn(*args, **kwargs)
+        seconds = time.perf_counter() - start
+
+        # A failed export must never fail the request being profiled
+        try:
+            self.captures.append(self._write(target, prof, seconds))
+        except Exception as e:
+            print("[PROFILER WARNING]", str(e))
+        return result
+
+    def _write(self, target: str, prof, seconds: float) -> dict:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = f"{target}_{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}_{os.getpid()}"
+        trace_path = os.path.join(self.output_dir, f"{stem}.trace.json")
+        table_path = os.path.join(self.output_dir, f"{stem}.ops.txt")
+        summary_path = os.path.join(self.output_dir, f"{stem}.summary.json")
+
+        prof.export_chrome_trace(trace_path)
+
+        averages = prof.key_averages()
+        with open(table_path, "w", encoding="utf-8") as f:
+            f.write(averages.table(sort_by="self_cpu_time_total", row_limit=SUMMARY_ROWS))
+            f.write("\n\n")
+            f.write(averages.table(sort_by="self_cpu_memory_usage", row_limit=SUMMARY_ROWS))
+
+        top_ops = sorted(averages, key=lambda e: e.self_cpu_time_total, reverse=True)[:SUMMARY_ROWS]
+        summary = {
+            "target": target,
+            "pid": os.getpid(),
+            "wall_ms": round(seconds * 1000, 3),
+            "trace": trace_path,
+            "ops": table_path,
+            "top_ops": [
+                {
+                    "name": event.key,
+                    "calls": event.count,
+                    "self_cpu_ms": round(event.self_cpu_time_total / 1000, 3),
+                    "cpu_ms": round(event.cpu_time_total / 1000, 3),
+                    "self_cpu_memory_bytes": event.self_cpu_memory_usage,
+                }
+                for event in top_ops
+            ],
+        }
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+        print(f"[PROFILER] {target} pass captured in {summary['wall_ms']} ms → {trace_path}")
+        return {"target": target, "wall_ms": summary["wall_ms"], "trace": trace_path, "summary": summary_path}
+
+
+forward_profiler = ForwardProfiler()
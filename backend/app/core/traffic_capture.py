@@ -0,0 +1,232 @@
+import hashlib
+import io
+import json
+import os
+import queue
+import random
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as email_policy
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from PIL import Image
+
+from app.core.config import (
+    TRAFFIC_CAPTURE_PATH, TRAFFIC_CAPTURE_SAMPLE,
+    TRAFFIC_CAPTURE_MAX_BODY_BYTES, TRAFFIC_CAPTURE_QUEUE_SIZE, TRAFFIC_CAPTURE_QUEUE_BYTES,
+)
+
+# Operational endpoints are not part of the user traffic mix
+SKIP_PREFIXES = ("/metrics", "/healthz", "/readyz", "/stats", "/admin", "/static", "/docs", "/openapi.json")
+
+# Form and query fields recorded verbatim; user_email is replaced by a hash
+# and anything else is recorded by name only.
+PLAIN_FIELDS = {"style_name", "response_mode", "prediction_id", "fields", "limit", "cursor", "style"}
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def user_key(email: str) -> str:
+    """Stable pseudonym so replays keep per-user patterns (history/gallery bursts)."""
+    return _digest(email.strip().lower().encode("utf-8"))
+
+
+def _fields(pairs) -> Dict[str, Any]:
+    fields = {}
+    for name, value in pairs:
+        if name == "user_email":
+            fields["user"] = user_key(value)
+        elif name in PLAIN_FIELDS:
+            fields[name] = value
+        else:
+            fields[name] = None
+    return fields
+
+
+def describe_file(field: str, filename: Optional[str], data: bytes) -> Dict[str, Any]:
+    info = {"field": field, "size": len(data), "sha256": _digest(data)}
+    if filename:
+        info["ext"] = os.path.splitext(filename)[1].lower()
+    try:
+        # Only the header is parsed; pixel data is never decoded or kept
+        with Image.open(io.BytesIO(data)) as image:
+            info["width"], info["height"] = image.size
+            info["format"] = image.format
+    except Exception:
+        info["format"] = "zip" if data[:2] == b"PK" else None
+    return info
+
+
+def parse_body(content_type: str, body: bytes):
+    """Returns (form fields, file descriptions) from a multipart or urlencoded body."""
+    if content_type.startswith("multipart/form-data"):
+        message = BytesParser(policy=email_policy).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+        )
+        pairs, files = [], []
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            payload = part.get_payload(decode=True) or b""
+            filename = part.get_filename()
+            if filename is not None:
+                files.append(describe_file(name, filename, payload))
+            else:
+                pairs.append((name, payload.decode("utf-8", "replace")))
+        return _fields(pairs), files
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        return _fields(parse_qsl(body.decode("latin-1"))), []
+    return {}, []
+
+
+# -------------------- RECORDER --------------------
+class TrafficRecorder:
+    """
+    Appends request records to a JSONL file from a background thread.
+
+    The request path only copies the body reference into a bounded queue;
+    multipart parsing, hashing and the file write happen on the writer
+    thread. The queue is bounded both in records and in body bytes held;
+    when either is full, records are dropped and counted rather than
+    slowing requests down or piling up upload bodies in memory.
+    """
+
+    def __init__(self, path: str, sample: float = 1.0, queue_size: int = 1000,
+                 queue_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.sample = sample
+        self.queue_bytes = queue_bytes
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._bytes_lock = threading.Lock()
+        self._queued_bytes = 0
+        self._thread: Optional[threading.Thread] = None
+        self.recorded = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self):
+        if self._thread is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._thread = threading.Thread(target=self._write_loop, name="traffic-capture", daemon=True)
+            self._thread.start()
+            print(f"[CAPTURE] Recording request shapes to {self.path}")
+
+    def should_capture(self, path: str) -> bool:
+        if path.startswith(SKIP_PREFIXES):
+            return False
+        return self.sample >= 1.0 or random.random() < self.sample
+
+    def submit(self, record: Dict[str, Any], content_type: str, body: Optional[bytes]):
+        size = len(body) if body else 0
+        with self._bytes_lock:
+            if self._queued_bytes + size > self.queue_bytes:
+                self.dropped += 1
+                return
+            self._queued_bytes += size
+        try:
+            self._queue.put_nowait((record, content_type, body))
+        except queue.Full:
+            self._release(size)
+            self.dropped += 1
+
+    def _release(self, size: int):
+        with self._bytes_lock:
+            self._queued_bytes -= size
+
+    def _write_loop(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                record, content_type, body = item
+                try:
+                    if body:
+                        form, files = parse_body(content_type, body)
+                        record["form"], record["files"] = form, files
+                    f.write(json.dumps(record) + "\n")
+                    f.flush()
+                    self.recorded += 1
+                except Exception as e:
+                    self.failed += 1
+                    print("[CAPTURE WARNING]", str(e))
+                finally:
+                    self._release(len(body) if body else 0)
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"recorded": self.recorded, "dropped": self.dropped, "failed": self.failed,
+                "queued": self._queue.qsize(), "queued_bytes": self._queued_bytes}
+
+
+traffic_recorder = TrafficRecorder(
+    TRAFFIC_CAPTURE_PATH, TRAFFIC_CAPTURE_SAMPLE, TRAFFIC_CAPTURE_QUEUE_SIZE, TRAFFIC_CAPTURE_QUEUE_BYTES,
+) if TRAFFIC_CAPTURE_PATH else None
+
+
+# -------------------- MIDDLEWARE --------------------
+class TrafficCaptureMiddleware:
+    """
+    Pure ASGI middleware: tees the request body as the app reads it and notes
+    the response status and size, so streaming endpoints are unaffected.
+    """
+
+    def __init__(self, app, recorder: TrafficRecorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.recorder.should_capture(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.time()
+        start = time.perf_counter()
+        chunks: List[bytes] = []
+        state = {"request_bytes": 0, "response_bytes": 0, "status": None, "truncated": False}
+
+        async def capture_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                state["request_bytes"] += len(body)
+                if state["request_bytes"] <= TRAFFIC_CAPTURE_MAX_BODY_BYTES:
+                    chunks.append(body)
+                else:
+                    state["truncated"] = True
+            return message
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["response_bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+            route = scope.get("route")
+            record = {
+                "ts": round(started_at, 3),
+                "method": scope["method"],
+                "route": getattr(route, "path", scope["path"]),
+                "status": state["status"] or 500,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                "request_bytes": state["request_bytes"],
+                "response_bytes": state["response_bytes"],
+                "params": _fields(parse_qsl(scope.get("query_string", b"").decode("latin-1"))),
+            }
+            if state["truncated"]:
+                record["truncated"] = True
+            body = None if state["truncated"] else b"".join(chunks)
+            self.recorder.submit(record, headers.get("content-type", ""), body)
@@ -0,0 +1,55 @@
+import os
+from typing import Any, Callable, Dict
+
+import torch
+import torch.nn as nn
+
+from app.core.config import WEIGHTS_FORMAT
+
+
+def safetensors_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".safetensors"
+
+
+def load_state_dict(path: str) -> Dict[str, Any]:
+    """
+    Loads weights for ``path`` without materializing a private copy if possible.
+
+    A ``.safetensors`` sibling is memory-mapped, so read-only weights are
+    backed by the OS page cache and shared by every worker process on the
+    box. Plain ``.pth`` files are opened with ``torch.load(mmap=True)`` when
+    they use the zip format, and fully unpickled otherwise.
+    """
+    st_path = path if path.endswith(".safetensors") else safetensors_path(path)
+    if WEIGHTS_FORMAT != "pickle" and os.path.exists(st_path):
+        from safetensors.torch import load_file
+        return load_file(st_path, device="cpu")
+    if WEIGHTS_FORMAT == "safetensors":
+        raise FileNotFoundError(f"WEIGHTS_FORMAT=safetensors but {st_path} does not exist")
+
+    try:
+        return torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    except (RuntimeError, TypeError, ValueError):
+        # Legacy (non-zip) checkpoints can't be mmapped; pickled extras need weights_only=False
+        return torch.load(path, map_location="cpu")
+
+
+def build_with_weights(build: Callable[[], nn.Module], state_dict: Dict[str, Any],
+                       device, strict: bool = True) -> nn.Module:
+    """
+    Builds a module on the meta device and adopts ``state_dict`` tensors as-is.
+
+    ``assign=True`` keeps the (memory-mapped) tensors instead of copying them
+    into freshly initialized parameters, so nothing is allocated twice.
+    """
+    try:
+        with torch.device("meta"):
+            model = build()
+        model.load_state_dict(state_dict, strict=strict, assign=True)
+        # Anything not in the checkpoint (e.g. non-persistent buffers) is still on meta
+        if any(t.is_meta for t in list(model.parameters()) + list(model.buffers())):
+            raise RuntimeError("checkpoint does not cover every tensor")
+    except (RuntimeError, TypeError):
+        model = build()
+        model.load_state_dict(state_dict, strict=strict)
+    return model.to(device).eval()
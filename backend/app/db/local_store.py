@@ -0,0 +1,151 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+class LocalStore:
+    """
+    Small persistent key/value store on a local SQLite file.
+
+    Values are stored as JSON with an optional expiry. It is used as the
+    durable tier behind the in-memory caches, so it favours simplicity over
+    throughput: one connection guarded by a lock, WAL mode for concurrent readers.
+    """
+
+    def __init__(self, path: str, table: str = "kv", max_entries: Optional[int] = None):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_updated_at ON {table} (updated_at)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+            prune = self.max_entries is not None and self._writes % 500 == 0
+        if prune:
+            self.prune()
+
+    def version(self, key: str) -> Optional[float]:
+        """``updated_at`` of a live entry. ``update`` makes it grow on every write, so it works as a version."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT updated_at, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def get_versioned(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """``(value, version)``, or ``(None, None)`` if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at, updated_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None, None
+        return json.loads(row[0]), row[2]
+
+    def update(self, key: str, fn: Callable[[Optional[Any], Optional[float]], Optional[Any]],
+               ttl_seconds: Optional[float] = None) -> Optional[float]:
+        """
+        Read-modify-write of one entry, atomic across every process using the file.
+
+        ``fn(value, version)`` gets the live value (None if missing or
+        expired) and returns the new value, or None to leave the entry alone.
+        Runs under the SQLite write lock, so ``fn`` must not touch the store.
+        Returns the new version, or None if nothing was written.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT value, expires_at, updated_at FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                now = time.time()
+                live = row is not None and (row[1] is None or row[1] > now)
+                value = fn(json.loads(row[0]) if live else None, row[2] if live else None)
+                if value is None:
+                    self._conn.rollback()
+                    return None
+                # Strictly increasing even if the clock didn't move between writes
+                updated_at = max(now, row[2] + 0.001) if row is not None else now
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, updated_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now + ttl_seconds if ttl_seconds else None, updated_at),
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._writes += 1
+            prune = self.max_entries is not None and self._writes % 500 == 0
+        if prune:
+            self.prune()
+        return updated_at
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def prune(self):
+        """Drop expired rows and, if over ``max_entries``, the least recently written ones."""
+        with self._lock:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            if self.max_entries is not None:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f" SELECT key FROM {self.table} ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
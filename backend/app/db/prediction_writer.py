@@ -0,0 +1,386 @@
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so segments of other processes are left alone
+    fcntl = None
+
+# SQLSTATE classes PostgREST passes through for rows the DB will never accept:
+# 22 data exception, 23 integrity constraint, 42 undefined column / bad syntax.
+# PGRST1xx/2xx are request and schema errors; PGRST0xx (connection) are transient.
+PERMANENT_ERROR_PREFIXES = ("22", "23", "42", "PGRST1", "PGRST2")
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """True when retrying the same rows cannot succeed (constraint, type or schema errors)."""
+    code = str(getattr(error, "code", "") or "")
+    return code.startswith(PERMANENT_ERROR_PREFIXES)
+
+
+def _read_segment(path: str) -> List[dict]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue  # torn last line from a crash mid-write
+    return rows
+
+
+def _same_file(handle, path: str) -> bool:
+    try:
+        return os.fstat(handle.fileno()).st_ino == os.stat(path).st_ino
+    except FileNotFoundError:
+        return False
+
+
+class PredictionWriter:
+    """
+    Write-behind queue for prediction rows.
+
+    ``enqueue(row)`` appends the row to a local spool file and returns; a
+    background thread makes sure each batch's users exist (one bulk upsert
+    that ignores existing emails) and bulk-inserts the predictions,
+    either when ``max_rows`` are waiting or every ``interval`` seconds.
+
+    Each process spools into its own ``writer-<pid>`` directory and holds a
+    flock on ``writer-<pid>.lock`` while running; at start, directories whose
+    lock is free belong to dead processes and their segments are adopted.
+
+    Segments hold at most ``max_rows`` rows and one insert covers whole
+    segments, so a segment is deleted as soon as its rows are in the DB and a
+    failed insert never re-sends earlier batches. Rows the DB rejects for
+    good (see ``is_permanent_error``) are moved to ``dead-letter.jsonl`` so
+    the rest of the queue keeps draining. Rows can still be sent twice if
+    the process dies between an insert and the segment's deletion.
+    """
+
+    def __init__(self, client_getter: Callable[[], Any], spool_dir: str, max_rows: int = 50,
+                 interval: float = 0.5, fsync: bool = False, known_users=None,
+                 on_flush: Optional[Callable[[List[dict], float], None]] = None):
+        self._client_getter = client_getter
+        self.spool_dir = spool_dir
+        self.max_rows = max(1, max_rows)
+        self.interval = max(0.01, interval)
+        self.fsync = fsync
+        self.known_users = known_users
+        self.on_flush = on_flush
+
+        self._dir = os.path.join(spool_dir, f"writer-{os.getpid()}")
+        self._dead_letter_path = os.path.join(spool_dir, "dead-letter.jsonl")
+        self._owner_lock = None
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sealed: List[Tuple[str, List[dict]]] = []  # (path, unsent rows), oldest first
+        self._active = None
+        self._active_path = None
+        self._active_rows: List[dict] = []
+        self._sequence = 0
+
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self.last_error: Optional[str] = None
+        self.last_flush_ms: Optional[float] = None
+
+    # -------------------- SPOOL --------------------
+    def _open_segment(self):
+        self._sequence += 1
+        self._active_path = os.path.join(
+            self._dir, f"spool-{int(time.time() * 1000)}-{os.getpid()}-{self._sequence}.jsonl"
+        )
+        self._active = open(self._active_path, "a", encoding="utf-8")
+        self._active_rows = []
+
+    def _seal_active(self):
+        """Closes the active segment and queues it for sending. Caller holds ``_lock``."""
+        if not self._active_rows:
+            return
+        self._active.close()
+        self._sealed.append((self._active_path, self._active_rows))
+        self._open_segment()
+
+    def _rewrite_segment(self, path: str, rows: List[dict]):
+        """Replaces a partly sent segment with its unsent rows."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _acquire_own_lock(self):
+        lock_path = self._dir + ".lock"
+        while True:
+            handle = open(lock_path, "a")
+            if fcntl is None:
+                break
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            # An adopter may have unlinked the file while we waited on it
+            if _same_file(handle, lock_path):
+                break
+            handle.close()
+        self._owner_lock = handle
+        os.makedirs(self._dir, exist_ok=True)
+
+    def _release_own_lock(self):
+        if self._owner_lock is None:
+            return
+        try:
+            if not os.listdir(self._dir):
+                os.rmdir(self._dir)
+                os.remove(self._dir + ".lock")
+        except OSError:
+            pass
+        self._owner_lock.close()
+        self._owner_lock = None
+
+    def _adopt(self, directory: str) -> int:
+        """Moves a dead writer's segments into ours; returns how many were taken."""
+        lock_path = directory + ".lock"
+        try:
+            handle = open(lock_path, "a")
+        except OSError:
+            return 0
+        try:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return 0  # owner is alive, or another process is adopting it
+            if not _same_file(handle, lock_path):
+                return 0
+            return self._take(glob.glob(os.path.join(directory, "spool-*.jsonl")), cleanup=(directory, lock_path))
+        finally:
+            handle.close()
+
+    def _take(self, paths: List[str], cleanup: Optional[Tuple[str, str]] = None) -> int:
+        taken = 0
+        for path in paths:
+            try:
+                # rename is atomic: if several processes race for an orphan, one wins
+                os.rename(path, os.path.join(self._dir, os.path.basename(path)))
+                taken += 1
+            except OSError:
+                continue
+        if cleanup is not None:
+            directory, lock_path = cleanup
+            for leftover in glob.glob(os.path.join(directory, "*.tmp")):
+                os.remove(leftover)
+            try:
+                os.rmdir(directory)
+                os.remove(lock_path)
+            except OSError:
+                pass
+        return taken
+
+    def _recover(self):
+        """Loads rows left in our directory and adopts segments of writers that are gone."""
+        if fcntl is not None:
+            for directory in glob.glob(os.path.join(self.spool_dir, "writer-*")):
+                if directory != self._dir and os.path.isdir(directory):
+                    self._adopt(directory)
+        # Segments written before spools were per process; all writers of that
+        # version are gone once this one runs.
+        self._take(glob.glob(os.path.join(self.spool_dir, "spool-*.jsonl")))
+
+        for leftover in glob.glob(os.path.join(self._dir, "*.tmp")):
+            os.remove(leftover)  # a rewrite that never replaced its segment
+        recovered = 0
+        for path in sorted(glob.glob(os.path.join(self._dir, "spool-*.jsonl"))):
+            rows = _read_segment(path)
+            if not rows:
+                os.remove(path)
+                continue
+            self._sealed.append((path, rows))
+            recovered += len(rows)
+        if recovered:
+            print(f"[PERSIST] Recovered {recovered} unsent prediction(s) from the spool.")
+
+    def _dead_letter(self, row: dict, error: Exception):
+        record = {"ts": time.time(), "error": str(error), "code": getattr(error, "code", None), "row": row}
+        # One O_APPEND write per line, so concurrent writers don't interleave
+        with open(self._dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+        self.dead_lettered += 1
+        print(f"[PERSIST ERROR] Rejected prediction for {row.get('user_email')} moved to "
+              f"{self._dead_letter_path}: {error}")
+
+    # -------------------- LIFECYCLE --------------------
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._acquire_own_lock()
+            self._recover()
+            self._open_segment()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="prediction-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Flushes what is buffered (best effort) and stops the writer thread."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        with self._lock:
+            if self._active is not None:
+                empty = not self._active_rows
+                self._active.close()
+                self._active = None
+                if empty:
+                    os.remove(self._active_path)
+            # Unsent segments stay in our directory for the next process to adopt
+            self._release_own_lock()
+
+    def enqueue(self, row: Dict[str, Any]):
+        if self._thread is None:
+            self.start()
+        line = json.dumps(row) + "\n"
+        with self._lock:
+            self._active.write(line)
+            self._active.flush()
+            if self.fsync:
+                os.fsync(self._active.fileno())
+            self._active_rows.append(row)
+            full = len(self._active_rows) >= self.max_rows
+            if full:
+                self._seal_active()
+        if full:
+            self._wake.set()
+
+    # -------------------- FLUSHING --------------------
+    def _run(self):
+        backoff = self.interval
+        while True:
+            self._wake.wait(timeout=backoff)
+            self._wake.clear()
+            stopping = self._stopping.is_set()
+            try:
+                while self._flush_once():
+                    pass  # drain full batches back to back
+                backoff = self.interval
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                backoff = min(max(backoff * 2, 1.0), 60.0)
+                print(f"[PERSIST ERROR] {e}; retrying in {backoff:.0f}s")
+                if stopping:
+                    return
+            if stopping:
+                return
+
+    def _flush_once(self) -> bool:
+        """Sends the oldest segments (up to ``max_rows`` rows); returns True if more are waiting."""
+        with self._lock:
+            self._seal_active()
+            if not self._sealed:
+                return False
+            # Whole segments only, so progress is committed by deleting files
+            batch = [self._sealed[0]]
+            size = len(batch[0][1])
+            for path, rows in self._sealed[1:]:
+                if size + len(rows) > self.max_rows:
+                    break
+                batch.append((path, rows))
+                size += len(rows)
+
+        start = time.perf_counter()
+        client = self._client_getter()
+        rows = [row for _, segment_rows in batch for row in segment_rows]
+        error = None
+        try:
+            self._ensure_users(client, {row["user_email"] for row in rows})
+            client.table("predictions").insert(rows).execute()
+            inserted = rows
+            for path, _ in batch:
+                self._commit(path)
+        except Exception as e:
+            if not is_permanent_error(e):
+                raise
+            # Some row is bad; send them one by one and set the offenders aside
+            inserted, error = self._insert_rows_singly(client, batch)
+        seconds = time.perf_counter() - start
+
+        self.flushed += len(inserted)
+        self.batches += 1
+        self.last_flush_ms = round(seconds * 1000, 2)
+        if self.on_flush is not None and inserted:
+            self.on_flush(inserted, seconds)
+        if error is not None:
+            raise error
+        with self._lock:
+            return bool(self._sealed)
+
+    def _insert_rows_singly(self, client, batch: List[Tuple[str, List[dict]]]):
+        """Returns the rows inserted and the transient error that stopped it, if any."""
+        inserted: List[dict] = []
+        for path, rows in batch:
+            for index, row in enumerate(rows):
+                try:
+                    self._ensure_users(client, {row["user_email"]})
+                    client.table("predictions").insert(row).execute()
+                    inserted.append(row)
+                except Exception as e:
+                    if not is_permanent_error(e):
+                        # Keep only what is left so the retry doesn't resend
+                        del rows[:index]
+                        self._rewrite_segment(path, rows)
+                        return inserted, e
+                    self._dead_letter(row, e)
+            self._commit(path)
+        return inserted, None
+
+    def _commit(self, path: str):
+        with self._lock:
+            self._sealed = [entry for entry in self._sealed if entry[0] != path]
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _ensure_users(self, client, emails):
+        if self.known_users is not None:
+            emails = {e for e in emails if self.known_users.get(e) is None}
+        if not emails:
+            return
+        # Upsert rather than select-then-insert: another worker may create
+        # the same user in between (needs a unique constraint on email)
+        client.table("users").upsert(
+            [{"email": email} for email in sorted(emails)], on_conflict="email", ignore_duplicates=True,
+        ).execute()
+        if self.known_users is not None:
+            for email in emails:
+                self.known_users.set(email, True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = sum(len(rows) for _, rows in self._sealed) + len(self._active_rows)
+            segments = len(self._sealed) + (1 if self._active is not None else 0)
+        return {
+            "running": self._thread is not None,
+            "buffered": buffered,
+            "spool_segments": segments,
+            "spool_dir": self._dir,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dead_lettered": self.dead_lettered,
+            "last_error": self.last_error,
+            "last_flush_ms": self.last_flush_ms,
+            "known_users": len(self.known_users) if self.known_users is not None else None,
+        }
@@ -1,11 +1,24 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.config import MODEL_LOADING
+from app.core.lifecycle import models
+from app.core.inference_pool import inference_pool
+from app.core.metrics import request_seconds, requests_total, inflight_requests
+from app.core.traffic_capture import traffic_recorder, TrafficCaptureMiddleware
+from app.utils.supabase_helpers import prediction_writer
 from app.api.predict import router as predict_router
+from app.api.predict_batch import router as predict_batch_router
 from app.api.history import router as history_router
 from app.api.delete import router as delete_router
 from app.api.gallery import router as gallery_router
 from app.api.prediction_details import router as prediction_details_router
 from app.api.style_transfer import router as style_transfer_router
+from app.api.stats import router as stats_router
+from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
+from app.api.admin import router as admin_router
 
 # -------------------- FASTAPI INIT --------------------
 app = FastAPI(title="🎨 Painting Style Classifier API")
@@ -23,12 +36,74 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination and conditional-request headers (/history/, /gallery/)
+    expose_headers=["ETag", "X-Next-Cursor", "Link", "X-Gallery-Counts"],
 )
 
+# Opt-in request-shape recording (TRAFFIC_CAPTURE_PATH)
+if traffic_recorder is not None:
+    app.add_middleware(TrafficCaptureMiddleware, recorder=traffic_recorder)
+
 # Include all routers
 app.include_router(predict_router)
+app.include_router(predict_batch_router)
 app.include_router(history_router)
 app.include_router(delete_router)
 app.include_router(gallery_router)
 app.include_router(prediction_details_router)
-app.include_router(style_transfer_router)
\ No newline at end of file
+app.include_router(style_transfer_router)
+app.include_router(stats_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
+
+
+# -------------------- REQUEST METRICS --------------------
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if request.url.path == "/metrics":
+        return await call_next(request)
+
+    start = time.perf_counter()
+    status = 500
+    with inflight_requests.track_inprogress():
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Route templates (/prediction/{id}) keep label cardinality bounded
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            request_seconds.observe(time.perf_counter() - start, route=path, method=request.method)
+            requests_total.inc(route=path, method=request.method, status=status)
+
+
+# -------------------- MODEL WARMUP --------------------
+@app.on_event("startup")
+async def warm_up_models():
+    if traffic_recorder is not None:
+        traffic_recorder.start()
+    if prediction_writer is not None:
+        # Also re-sends anything a previous process left in the spool
+        prediction_writer.start()
+
+    # With INFERENCE_WORKERS > 0 the workers own (and warm) the heavy models
+    inference_pool.start()
+    if inference_pool.enabled:
+        return
+
+    # Models load lazily; see MODEL_LOADING in config.py
+    if MODEL_LOADING == "eager":
+        await models.warmup_all()
+    elif MODEL_LOADING == "background":
+        app.state.warmup_task = asyncio.create_task(models.warmup_all())
+
+
+@app.on_event("shutdown")
+async def stop_inference_workers():
+    inference_pool.stop()
+    if prediction_writer is not None:
+        prediction_writer.stop()
+    if traffic_recorder is not None:
+        traffic_recorder.stop()
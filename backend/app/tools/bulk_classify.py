@@ -0,0 +1,233 @@
+"""
+Classify a directory tree offline with the production style classifier.
+
+    python -m app.tools.bulk_classify /data/archive --output runs/archive --workers 8
+    python -m app.tools.bulk_classify /data/archive --output runs/archive --format parquet
+
+Images are decoded by a multi-worker DataLoader and classified in batches
+with the same model, transform and class names as the API (the engine is
+chosen by INFERENCE_ENGINE / --engine). Results are flushed every
+--checkpoint-every images; rerunning with the same --output skips every file
+already written, so a crashed run resumes where it left off.
+
+Output rows: {"path", "style", "confidence", "predictions": [[class, score] x3]}
+or {"path", "error"} for unreadable files.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+from app.core.config import INFERENCE_ENGINE
+from app.core.engine import create_engine
+from app.core.model_loader import transform, class_names
+from app.utils.preprocessing import decode_image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+# -------------------- INPUT --------------------
+def walk_images(root: str):
+    """Yields image paths under root in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+class ImageFiles(Dataset):
+    def __init__(self, paths):
+        self.paths = paths
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, index):
+        path = self.paths[index]
+        try:
+            with open(path, "rb") as f:
+                image = decode_image(f.read())
+            return path, transform(image), None
+        except Exception as e:
+            return path, None, str(e)
+
+
+def collate(items):
+    ok = [(path, tensor) for path, tensor, error in items if error is None]
+    failed = [(path, error) for path, _, error in items if error is not None]
+    paths = [path for path, _ in ok]
+    batch = torch.stack([tensor for _, tensor in ok]) if ok else None
+    return paths, batch, failed
+
+
+# -------------------- OUTPUT --------------------
+class JsonlWriter:
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, "results.jsonl")
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def completed_paths(output_dir: str) -> set:
+        done = set()
+        path = os.path.join(output_dir, "results.jsonl")
+        if not os.path.exists(path):
+            return done
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["path"])
+                except (ValueError, KeyError):
+                    continue  # partial last line from a crash
+        return done
+
+    def write(self, rows):
+        for row in rows:
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def checkpoint(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self.checkpoint()
+        self._file.close()
+
+
+class ParquetWriter:
+    """Writes one part file per checkpoint so finished parts are never rewritten."""
+
+    def __init__(self, output_dir: str):
+        import pyarrow  # noqa: F401  (fail early if missing)
+        self.output_dir = output_dir
+        self._rows = []
+        self._part = len(glob.glob(os.path.join(output_dir, "part-*.parquet")))
+
+    @staticmethod
+    def completed_paths(output_dir: str) -> set:
+        import pyarrow.parquet as pq
+        done = set()
+        for part in sorted(glob.glob(os.path.join(output_dir, "part-*.parquet"))):
+            done.update(pq.read_table(part, columns=["path"]).column("path").to_pylist())
+        return done
+
+    def write(self, rows):
+        self._rows.extend(rows)
+
+    def checkpoint(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if not self._rows:
+            return
+        table = pa.Table.from_pylist([
+            {
+                "path": row["path"],
+                "style": row.get("style"),
+                "confidence": row.get("confidence"),
+                "predictions": json.dumps(row["predictions"]) if "predictions" in row else None,
+                "error": row.get("error"),
+            }
+            for row in self._rows
+        ])
+        final = os.path.join(self.output_dir, f"part-{self._part:05d}.parquet")
+        pq.write_table(table, final + ".tmp")
+        os.replace(final + ".tmp", final)
+        self._part += 1
+        self._rows = []
+
+    def close(self):
+        self.checkpoint()
+
+
+WRITERS = {"jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+
+def write_checkpoint_meta(output_dir: str, processed: int, total: int, started: float):
+    meta = {
+        "processed": processed,
+        "total": total,
+        "elapsed_seconds": round(time.time() - started, 1),
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+    tmp = os.path.join(output_dir, "checkpoint.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(output_dir, "checkpoint.json"))
+
+
+# -------------------- CLI --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="directory tree of images")
+    parser.add_argument("--output", required=True, help="output directory (reused to resume)")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl")
+    parser.add_argument("--engine", default=INFERENCE_ENGINE, choices=["torch", "onnx"])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--checkpoint-every", type=int, default=5000, help="images between checkpoints")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    writer_cls = WRITERS[args.format]
+
+    done = writer_cls.completed_paths(args.output)
+    paths = [path for path in walk_images(args.root) if path not in done]
+    total = len(paths) + len(done)
+    print(f"{len(done)} already classified, {len(paths)} to go.")
+    if not paths:
+        return 0
+
+    engine = create_engine(args.engine)
+    writer = writer_cls(args.output)
+    loader = DataLoader(
+        ImageFiles(paths),
+        batch_size=args.batch_size,
+        num_workers=args.workers,
+        collate_fn=collate,
+        persistent_workers=args.workers > 0,
+        prefetch_factor=4 if args.workers > 0 else None,
+    )
+
+    started = time.time()
+    processed = len(done)
+    since_checkpoint = 0
+    try:
+        for batch_paths, batch, failed in loader:
+            rows = [{"path": path, "error": error} for path, error in failed]
+            if batch is not None:
+                probs = engine.predict(batch)
+                topk = torch.topk(probs, k=min(3, probs.shape[1]), dim=1)
+                for path, indices, scores in zip(batch_paths, topk.indices.tolist(), topk.values.tolist()):
+                    predictions = [[class_names[i], round(s, 4)] for i, s in zip(indices, scores)]
+                    rows.append({
+                        "path": path,
+                        "style": predictions[0][0],
+                        "confidence": predictions[0][1],
+                        "predictions": predictions,
+                    })
+
+            writer.write(rows)
+            processed += len(rows)
+            since_checkpoint += len(rows)
+            if since_checkpoint >= args.checkpoint_every:
+                writer.checkpoint()
+                write_checkpoint_meta(args.output, processed, total, started)
+                since_checkpoint = 0
+                rate = (processed - len(done)) / max(time.time() - started, 1e-6)
+                print(f"✅ {processed}/{total} ({rate:.1f} img/s)")
+    finally:
+        writer.close()
+        write_checkpoint_meta(args.output, processed, total, started)
+
+    print(f"✅ Done: {processed}/{total} images in {time.time() - started:.1f}s → {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Convert pickled .pth weights to memory-mappable .safetensors files.
+
+    python -m app.tools.convert_safetensors app/models/best_model.pth app/models/saved_models/*.pth
+    python -m app.tools.convert_safetensors --clip
+
+Each X.pth gets a sibling X.safetensors, which the loaders pick up
+automatically (WEIGHTS_FORMAT=auto). --clip writes the open_clip ViT-B-32
+weights to CLIP_WEIGHTS_PATH. The YOLO .pt checkpoint pickles the whole
+Ultralytics model object rather than a state dict, so it is not converted.
+"""
+import argparse
+import sys
+
+import torch
+
+from app.core.config import CLIP_WEIGHTS_PATH
+from app.core.weights import safetensors_path
+
+
+def to_safetensors(state_dict, output_path: str):
+    from safetensors.torch import save_file
+
+    # safetensors needs contiguous tensors that don't share storage
+    tensors = {
+        key: value.detach().cpu().contiguous().clone()
+        for key, value in state_dict.items()
+        if isinstance(value, torch.Tensor)
+    }
+    save_file(tensors, output_path, metadata={"format": "pt"})
+    print(f"✅ Wrote {len(tensors)} tensors to {output_path}")
+
+
+def convert_checkpoint(path: str):
+    state_dict = torch.load(path, map_location="cpu")
+    if isinstance(state_dict, dict) and "state_dict" in state_dict:
+        state_dict = state_dict["state_dict"]
+    if not isinstance(state_dict, dict) or not any(isinstance(v, torch.Tensor) for v in state_dict.values()):
+        print(f"Skipping {path}: not a state dict (e.g. an Ultralytics checkpoint).")
+        return
+    to_safetensors(state_dict, safetensors_path(path))
+
+
+def convert_clip(output_path: str = CLIP_WEIGHTS_PATH):
+    from app.utils.clip_filter import CLIP_MODEL_NAME, CLIP_PRETRAINED
+    import open_clip
+
+    clip_model, _, _ = open_clip.create_model_and_transforms(CLIP_MODEL_NAME, pretrained=CLIP_PRETRAINED)
+    to_safetensors(clip_model.state_dict(), output_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("checkpoints", nargs="*", help=".pth files to convert")
+    parser.add_argument("--clip", action="store_true", help="also export the CLIP weights")
+    args = parser.parse_args(argv)
+
+    if not args.checkpoints and not args.clip:
+        parser.error("nothing to convert")
+
+    for path in args.checkpoints:
+        convert_checkpoint(path)
+    if args.clip:
+        convert_clip()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Measure the two-tier art gate against CLIP on a labelled folder.
+
+    python -m app.tools.eval_art_gate /data/gate_eval
+    python -m app.tools.eval_art_gate /data/gate_eval --low 0.1 --high 0.9 --output gate_report.json
+
+The folder holds one subfolder per label, matching dataset/binary_model.py:
+art/ and non_art/. Every image is scored once by the ResNet18 filter and
+once by CLIP; the report then replays the gate for each (low, high) pair and
+gives the share of images that would still reach CLIP, the gate's agreement
+with CLIP-only decisions, and accuracy against the folder labels.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from app.core.config import ART_GATE_LOW, ART_GATE_HIGH
+from app.core.lifecycle import models
+from app.utils.art_filter import art_probability
+from app.utils.art_gate import gate_decision
+from app.utils.clip_filter import is_art_clip
+from app.utils.preprocessing import decode_image, to_uint8_tensor
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+LABELS = {"art": True, "non_art": False}
+
+
+# -------------------- SCORING --------------------
+def labelled_images(root: str):
+    for label, is_art in LABELS.items():
+        folder = os.path.join(root, label)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(folder, name), is_art
+
+
+def score(root: str):
+    """One (label, P(art), clip verdict) row per readable image, plus timings."""
+    rows = []
+    filter_seconds = clip_seconds = 0.0
+    for path, label in labelled_images(root):
+        try:
+            with open(path, "rb") as f:
+                pixels = to_uint8_tensor(decode_image(f.read()))
+        except Exception as e:
+            print(f"⚠️ Skipping {path}: {e}")
+            continue
+
+        start = time.perf_counter()
+        art_prob = art_probability(pixels)
+        filter_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        clip_art = bool(is_art_clip(pixels))
+        clip_seconds += time.perf_counter() - start
+
+        rows.append((label, art_prob, clip_art))
+
+    n = len(rows) or 1
+    timings = {
+        "filter_ms_per_image": round(1000 * filter_seconds / n, 2),
+        "clip_ms_per_image": round(1000 * clip_seconds / n, 2),
+    }
+    return rows, timings
+
+
+# -------------------- REPORT --------------------
+def evaluate(rows, low: float, high: float) -> dict:
+    clip_calls = agree = correct = 0
+    for label, art_prob, clip_art in rows:
+        decision = gate_decision(art_prob, low, high)
+        if decision is None:
+            clip_calls += 1
+            decision = clip_art
+        agree += decision == clip_art
+        correct += decision == label
+
+    n = len(rows) or 1
+    return {
+        "low": low,
+        "high": high,
+        "clip_call_rate": round(clip_calls / n, 4),
+        "agreement_with_clip": round(agree / n, 4),
+        "accuracy": round(correct / n, 4),
+    }
+
+
+def baseline(rows) -> dict:
+    n = len(rows) or 1
+    return {
+        "images": len(rows),
+        "clip_accuracy": round(sum(clip_art == label for label, _, clip_art in rows) / n, 4),
+        "filter_accuracy_at_0.5": round(sum((p >= 0.5) == label for label, p, _ in rows) / n, 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="folder with art/ and non_art/ subfolders")
+    parser.add_argument("--low", type=float, nargs="*", default=[ART_GATE_LOW, 0.02, 0.1, 0.2])
+    parser.add_argument("--high", type=float, nargs="*", default=[ART_GATE_HIGH, 0.8, 0.9, 0.98])
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        models.get("art_filter")
+    except Exception as e:
+        print(f"❌ Art filter could not be loaded: {e}")
+        return 1
+
+    rows, timings = score(args.root)
+    if not rows:
+        print(f"❌ No labelled images under {args.root}")
+        return 1
+
+    grid = sorted({(low, high) for low in args.low for high in args.high if low < high})
+    report = {**baseline(rows), **timings, "thresholds": [evaluate(rows, low, high) for low, high in grid]}
+
+    print(f"Images: {report['images']}  CLIP accuracy: {report['clip_accuracy']}  "
+          f"filter: {timings['filter_ms_per_image']} ms  CLIP: {timings['clip_ms_per_image']} ms")
+    print(f"{'low':>6} {'high':>6} {'clip%':>7} {'agree':>7} {'acc':>7}")
+    for row in report["thresholds"]:
+        print(f"{row['low']:>6} {row['high']:>6} {row['clip_call_rate']:>7.2%} "
+              f"{row['agreement_with_clip']:>7.2%} {row['accuracy']:>7.2%}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Export the painting-style classifier to ONNX and check it against eager torch.
+
+    python -m app.tools.export_onnx
+    python -m app.tools.export_onnx --samples path/to/paintings --output app/models/best_model.onnx
+
+The parity check runs both engines over the sample images (or random inputs
+if no folder is given) and fails if any top-3 ranking differs or the
+probabilities drift by more than --atol.
+"""
+import argparse
+import os
+import sys
+
+import torch
+from PIL import Image
+
+from app.core.config import MODEL_PATH, ONNX_MODEL_PATH
+from app.core.engine import TorchEngine, OnnxEngine
+from app.core.model_loader import load_model, transform
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def export(model: torch.nn.Module, output_path: str, opset: int = 17):
+    model = model.cpu().eval()
+    dummy = torch.randn(1, 3, 224, 224)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    torch.onnx.export(
+        model,
+        dummy,
+        output_path,
+        input_names=["input"],
+        output_names=["logits"],
+        dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=opset,
+        do_constant_folding=True,
+    )
+    print(f"✅ Exported ONNX graph to {output_path}")
+
+
+def load_samples(samples_dir: str, limit: int) -> torch.Tensor:
+    if not samples_dir:
+        torch.manual_seed(0)
+        return torch.randn(limit, 3, 224, 224)
+
+    tensors = []
+    for root, _, files in os.walk(samples_dir):
+        for file in sorted(files):
+            if file.lower().endswith(IMAGE_EXTENSIONS):
+                image = Image.open(os.path.join(root, file)).convert("RGB")
+                tensors.append(transform(image))
+            if len(tensors) >= limit:
+                return torch.stack(tensors)
+    if not tensors:
+        raise SystemExit(f"No images found in {samples_dir}")
+    return torch.stack(tensors)
+
+
+def check_parity(reference, candidate, inputs: torch.Tensor, batch_size: int = 16, atol: float = 1e-3) -> bool:
+    """Compares top-3 rankings and probabilities of two engines on the same inputs."""
+    mismatches = 0
+    max_diff = 0.0
+    for start in range(0, len(inputs), batch_size):
+        batch = inputs[start:start + batch_size]
+        ref = reference.predict(batch)
+        cand = candidate.predict(batch)
+        max_diff = max(max_diff, (ref - cand).abs().max().item())
+        ref_top = torch.topk(ref, k=3, dim=1).indices
+        cand_top = torch.topk(cand, k=3, dim=1).indices
+        mismatches += (ref_top != cand_top).any(dim=1).sum().item()
+
+    print(f"Parity on {len(inputs)} samples: top-3 mismatches={mismatches}, max |Δp|={max_diff:.2e}")
+    return mismatches == 0 and max_diff <= atol
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", default=MODEL_PATH)
+    parser.add_argument("--output", default=ONNX_MODEL_PATH)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--samples", help="folder of sample paintings for the parity check")
+    parser.add_argument("--limit", type=int, default=64, help="max samples to compare")
+    parser.add_argument("--atol", type=float, default=1e-3)
+    parser.add_argument("--skip-check", action="store_true")
+    args = parser.parse_args(argv)
+
+    model = load_model(args.weights).cpu()
+    export(model, args.output, args.opset)
+
+    if args.skip_check:
+        return 0
+
+    ok = check_parity(TorchEngine(model), OnnxEngine(args.output), load_samples(args.samples, args.limit), atol=args.atol)
+    print("✅ Parity check passed." if ok else "❌ Parity check failed.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Build an INT8 variant of the painting-style classifier and gate it on accuracy.
+
+    python -m app.tools.quantize --mode static --calibration path/to/paintings --eval path/to/labelled
+
+--mode dynamic quantizes the Linear head only (no calibration needed);
+--mode static quantizes the whole network with FX graph mode, calibrated on
+--calibration images. The --eval folder should contain one subfolder per
+class name; without it, agreement with fp32 is measured on the calibration set.
+
+Writes <output-dir>/best_model.int8-<mode>-<version>.pt (TorchScript) and a
+.json report next to it. The loader only auto-selects artifacts whose report
+passed the gate (see MODEL_VARIANT / QUANTIZED_MODEL_PATH in config.py).
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import torch
+import torch.nn as nn
+from PIL import Image
+
+from app.core.config import MODEL_PATH, QUANTIZED_MODEL_DIR
+from app.core.model_loader import load_model, transform, class_names
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+# -------------------- DATA --------------------
+def list_images(folder: str, limit: int = None):
+    """Returns [(path, label_index or None)] with labels taken from class-named subfolders."""
+    class_index = {name: i for i, name in enumerate(class_names)}
+    items = []
+    for root, _, files in os.walk(folder):
+        label = class_index.get(os.path.basename(root))
+        for file in sorted(files):
+            if file.lower().endswith(IMAGE_EXTENSIONS):
+                items.append((os.path.join(root, file), label))
+    return items[:limit] if limit else items
+
+
+def batches(items, batch_size: int):
+    for start in range(0, len(items), batch_size):
+        chunk = items[start:start + batch_size]
+        tensors = [transform(Image.open(path).convert("RGB")) for path, _ in chunk]
+        yield torch.stack(tensors), [label for _, label in chunk]
+
+
+# -------------------- QUANTIZATION --------------------
+def quantize_dynamic(model: nn.Module) -> nn.Module:
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_static(model: nn.Module, calibration, batch_size: int) -> nn.Module:
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    torch.backends.quantized.engine = "x86" if "x86" in torch.backends.quantized.supported_engines else "fbgemm"
+    example_inputs = (torch.randn(1, 3, 224, 224),)
+    prepared = prepare_fx(model, get_default_qconfig_mapping(torch.backends.quantized.engine), example_inputs)
+
+    with torch.no_grad():
+        for inputs, _ in batches(calibration, batch_size):
+            prepared(inputs)
+
+    return convert_fx(prepared)
+
+
+# -------------------- REPORT --------------------
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_latency_ms(model, runs: int = 20) -> dict:
+    single = torch.randn(1, 3, 224, 224)
+    batch = torch.randn(16, 3, 224, 224)
+    with torch.no_grad():
+        for _ in range(3):
+            model(single)
+        start = time.perf_counter()
+        for _ in range(runs):
+            model(single)
+        single_ms = (time.perf_counter() - start) / runs * 1000
+        start = time.perf_counter()
+        model(batch)
+        batch_ms = (time.perf_counter() - start) * 1000
+    return {"batch1_ms": round(single_ms, 2), "batch16_ms_per_image": round(batch_ms / 16, 2)}
+
+
+def compare(fp32_model, int8_model, items, batch_size: int) -> dict:
+    total = labelled = 0
+    correct_fp32 = correct_int8 = top1_agree = top3_agree = 0
+
+    with torch.no_grad():
+        for inputs, labels in batches(items, batch_size):
+            top_fp32 = torch.topk(fp32_model(inputs), k=3, dim=1).indices
+            top_int8 = torch.topk(int8_model(inputs), k=3, dim=1).indices
+            for ref, cand, label in zip(top_fp32.tolist(), top_int8.tolist(), labels):
+                total += 1
+                top1_agree += ref[0] == cand[0]
+                top3_agree += set(ref) == set(cand)
+                if label is not None:
+                    labelled += 1
+                    correct_fp32 += ref[0] == label
+                    correct_int8 += cand[0] == label
+
+    return {
+        "samples": total,
+        "labelled_samples": labelled,
+        "fp32_accuracy": round(correct_fp32 / labelled, 4) if labelled else None,
+        "int8_accuracy": round(correct_int8 / labelled, 4) if labelled else None,
+        "top1_agreement": round(top1_agree / total, 4) if total else None,
+        "top3_agreement": round(top3_agree / total, 4) if total else None,
+    }
+
+
+def sha256_of(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# -------------------- CLI --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["dynamic", "static"], default="static")
+    parser.add_argument("--weights", default=MODEL_PATH)
+    parser.add_argument("--calibration", help="folder of sample paintings (required for static)")
+    parser.add_argument("--calibration-limit", type=int, default=256)
+    parser.add_argument("--eval", help="labelled folder with one subfolder per class")
+    parser.add_argument("--eval-limit", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--output-dir", default=QUANTIZED_MODEL_DIR)
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01)
+    parser.add_argument("--min-top3-agreement", type=float, default=0.95)
+    args = parser.parse_args(argv)
+
+    if args.mode == "static" and not args.calibration:
+        parser.error("--calibration is required for static quantization")
+
+    calibration = list_images(args.calibration, args.calibration_limit) if args.calibration else []
+    eval_items = list_images(args.eval, args.eval_limit) if args.eval else calibration
+    if not eval_items:
+        parser.error("no evaluation images: pass --eval or --calibration")
+
+    rss_start = current_rss_mb()
+    fp32_model = load_model(args.weights).cpu().eval()
+    rss_fp32 = current_rss_mb() - rss_start
+
+    print(f"Quantizing ({args.mode})...")
+    if args.mode == "dynamic":
+        int8_model = quantize_dynamic(load_model(args.weights).cpu().eval())
+    else:
+        int8_model = quantize_static(load_model(args.weights).cpu().eval(), calibration, args.batch_size)
+
+    scripted = torch.jit.trace(int8_model, torch.randn(1, 3, 224, 224))
+    scripted = torch.jit.freeze(scripted.eval())
+
+    version = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    os.makedirs(args.output_dir, exist_ok=True)
+    artifact = os.path.join(args.output_dir, f"best_model.int8-{args.mode}-{version}.pt")
+    torch.jit.save(scripted, artifact)
+
+    rss_before = current_rss_mb()
+    served = torch.jit.load(artifact, map_location="cpu").eval()
+    rss_int8 = current_rss_mb() - rss_before
+
+    print("Comparing against fp32...")
+    quality = compare(fp32_model, served, eval_items, args.batch_size)
+
+    passed = (quality["top3_agreement"] or 0) >= args.min_top3_agreement
+    if quality["fp32_accuracy"] is not None:
+        passed = passed and quality["fp32_accuracy"] - quality["int8_accuracy"] <= args.max_accuracy_drop
+
+    report = {
+        "artifact": os.path.basename(artifact),
+        "version": version,
+        "mode": args.mode,
+        "source_weights": os.path.basename(args.weights),
+        "source_sha256": sha256_of(args.weights),
+        "quality": quality,
+        "latency": {"fp32": measure_latency_ms(fp32_model), "int8": measure_latency_ms(served)},
+        "rss_mb": {"fp32_load": round(rss_fp32, 1), "int8_load": round(rss_int8, 1)},
+        "size_mb": {
+            "fp32": round(os.path.getsize(args.weights) / 2**20, 1),
+            "int8": round(os.path.getsize(artifact) / 2**20, 1),
+        },
+        "gate": {
+            "max_accuracy_drop": args.max_accuracy_drop,
+            "min_top3_agreement": args.min_top3_agreement,
+        },
+        "passed": passed,
+    }
+    with open(os.path.splitext(artifact)[0] + ".json", "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+    print("✅ Gate passed." if passed else "❌ Gate failed; the loader will not auto-select this artifact.")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import torch
+import torch.nn as nn
+import timm
+from app.core.config import ART_FILTER_PATH, device
+from app.core.weights import load_state_dict, build_with_weights
+from app.core.lifecycle import models
+from app.core.profiler import forward_profiler
+from app.core.inference_pool import inference_pool
+from app.utils.preprocessing import classifier_input
+
+# ✅ ResNet18 binary filter trained by dataset/binary_model.py
+# ImageFolder classes: ['art', 'non_art'] → class 0 = art
+
+
+def build_art_filter() -> nn.Module:
+    model = timm.create_model('resnet18', pretrained=False)
+    model.fc = nn.Linear(model.fc.in_features, 2)
+    return model
+
+
+def load_art_filter() -> nn.Module:
+    return build_with_weights(build_art_filter, load_state_dict(ART_FILTER_PATH), device)
+
+
+def _warmup_art_filter(model: nn.Module):
+    art_probability(torch.zeros(3, 224, 224, dtype=torch.uint8))
+
+
+# Optional: without weights the gate falls back to CLIP for every image
+models.register("art_filter", load_art_filter, _warmup_art_filter, required=False)
+
+
+@torch.no_grad()
+def art_probability(pixels: torch.Tensor) -> float:
+    """P(art) for the shared (3, H, W) uint8 image tensor."""
+    if inference_pool.enabled:
+        return inference_pool.call("art_filter", pixels)
+
+    # Same 224x224 / ImageNet-normalized input as the training transform
+    img_tensor = classifier_input(pixels).unsqueeze(0).to(device)
+    output = forward_profiler.run("art_filter", models.get("art_filter"), img_tensor)
+    probs = torch.softmax(output, dim=1)
+    return probs[0][0].item()  # class 0 = art
@@ -0,0 +1,79 @@
+import threading
+import torch
+from app.core.config import ART_GATE_ENABLED, ART_GATE_HIGH, ART_GATE_LOW
+from app.core.metrics import stage
+from app.utils.art_filter import art_probability
+from app.utils.clip_filter import is_art_clip
+
+
+# -------------------- GATE STATS --------------------
+class GateStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.filter_art = 0
+        self.filter_non_art = 0
+        self.clip_calls = 0
+        self.filter_errors = 0
+
+    def add(self, counter: str):
+        with self._lock:
+            self.requests += 1
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.requests or 1
+            return {
+                "requests": self.requests,
+                "filter_art": self.filter_art,
+                "filter_non_art": self.filter_non_art,
+                "clip_calls": self.clip_calls,
+                "filter_errors": self.filter_errors,
+                "clip_call_rate": round(self.clip_calls / total, 4),
+                "thresholds": {"low": ART_GATE_LOW, "high": ART_GATE_HIGH},
+            }
+
+
+gate_stats = GateStats()
+
+
+# -------------------- TWO-TIER GATE --------------------
+def gate_decision(art_prob: float, low: float = ART_GATE_LOW, high: float = ART_GATE_HIGH):
+    """True/False when the filter is confident, None when CLIP has to decide."""
+    if art_prob >= high:
+        return True
+    if art_prob <= low:
+        return False
+    return None
+
+
+def is_art(pixels: torch.Tensor) -> bool:
+    """
+    Art/non-art verdict for the shared (3, H, W) uint8 tensor.
+
+    The small ResNet18 filter settles confident cases; only the uncertain
+    band (and any filter failure) pays for CLIP ViT-B-32.
+    """
+    if ART_GATE_ENABLED:
+        try:
+            with stage("art_filter"):
+                art_prob = art_probability(pixels)
+        except Exception as e:
+            print("[ART FILTER WARNING]", str(e))
+        else:
+            decision = gate_decision(art_prob)
+            print(f"[ART FILTER] P(art)={art_prob:.3f} → {'CLIP' if decision is None else decision}")
+            if decision is not None:
+                gate_stats.add("filter_art" if decision else "filter_non_art")
+                return decision
+            gate_stats.add("clip_calls")
+            return _clip(pixels)
+        gate_stats.add("filter_errors")
+
+    return _clip(pixels)
+
+
+def _clip(pixels: torch.Tensor) -> bool:
+    with stage("clip"):
+        return is_art_clip(pixels)
@@ -1,16 +1,22 @@
+import os
 import torch
 import open_clip
 from PIL import Image
+from typing import Union, NamedTuple, Callable
+from app.core.config import (
+    PROMPT_BANK_DIR, CLIP_PROMPTS_PATH, CLIP_PROMPTS_CHECK_SECONDS, CLIP_WEIGHTS_PATH, WEIGHTS_FORMAT,
+)
+from app.core.weights import load_state_dict
+from app.utils.prompt_bank import PromptBank
+from app.utils.preprocessing import clip_input
+from app.core.lifecycle import models
+from app.core.profiler import forward_profiler
+from app.core.inference_pool import inference_pool
 
 device = "cuda" if torch.cuda.is_available() else "cpu"
 
-# Load the CLIP model from open-clip
-clip_model, _, preprocess = open_clip.create_model_and_transforms(
-    "ViT-B-32", pretrained="openai"
-)
-clip_model = clip_model.to(device)
-
-tokenizer = open_clip.get_tokenizer("ViT-B-32")
+CLIP_MODEL_NAME = "ViT-B-32"
+CLIP_PRETRAINED = "openai"
 
 # Prompts
 ART_PROMPTS = [
@@ -39,27 +45,71 @@ NON_ART_PROMPTS = [
 ]
 
 
+class ClipBundle(NamedTuple):
+    model: torch.nn.Module
+    preprocess: Callable
+    prompt_bank: PromptBank
+
+
+def load_clip() -> ClipBundle:
+    # Load the CLIP model from open-clip, preferring the converted safetensors
+    # weights (memory-mapped, shared across workers) over the pickled download
+    if WEIGHTS_FORMAT != "pickle" and os.path.exists(CLIP_WEIGHTS_PATH):
+        clip_model, _, preprocess = open_clip.create_model_and_transforms(CLIP_MODEL_NAME, pretrained=None)
+        clip_model.load_state_dict(load_state_dict(CLIP_WEIGHTS_PATH), assign=True)
+    else:
+        clip_model, _, preprocess = open_clip.create_model_and_transforms(
+            CLIP_MODEL_NAME, pretrained=CLIP_PRETRAINED
+        )
+    clip_model = clip_model.to(device)
+    clip_model.eval()
+
+    tokenizer = open_clip.get_tokenizer(CLIP_MODEL_NAME)
+
+    # Text embeddings are encoded once per prompt set and cached on disk
+    prompt_bank = PromptBank(
+        clip_model,
+        tokenizer,
+        model_name=f"{CLIP_MODEL_NAME}-{CLIP_PRETRAINED}",
+        cache_dir=PROMPT_BANK_DIR,
+        device=device,
+        default_art=ART_PROMPTS,
+        default_non_art=NON_ART_PROMPTS,
+        prompts_path=CLIP_PROMPTS_PATH,
+        check_interval=CLIP_PROMPTS_CHECK_SECONDS,
+    )
+    return ClipBundle(clip_model, preprocess, prompt_bank)
+
+
+def _warmup_clip(bundle: ClipBundle):
+    # Also encodes (or loads) the prompt bank
+    is_art_clip(torch.zeros(3, 224, 224, dtype=torch.uint8))
+
+
+models.register("clip", load_clip, _warmup_clip)
+
+
 @torch.no_grad()
-def is_art_clip(image: Image.Image) -> bool:
-    image_input = preprocess(image).unsqueeze(0).to(device)
+def is_art_clip(image: Union[Image.Image, torch.Tensor]) -> bool:
+    if inference_pool.enabled and isinstance(image, torch.Tensor):
+        return inference_pool.call("clip", image)
+
+    clip = models.get("clip")
 
-    # Tokenize prompts
-    art_tokens = tokenizer(ART_PROMPTS).to(device)
-    non_art_tokens = tokenizer(NON_ART_PROMPTS).to(device)
+    # A tensor is the shared (3, H, W) uint8 upload, resized here with torch ops
+    if isinstance(image, torch.Tensor):
+        image_input = clip_input(image).unsqueeze(0).to(device)
+    else:
+        image_input = clip.preprocess(image).unsqueeze(0).to(device)
+    prompts = clip.prompt_bank.current()
 
     # Encode image
-    image_features = clip_model.encode_image(image_input)
+    image_features = forward_profiler.run("clip", clip.model.encode_image, image_input)
     image_features /= image_features.norm(dim=-1, keepdim=True)
 
-    # Encode text
-    art_features = clip_model.encode_text(art_tokens)
-    non_art_features = clip_model.encode_text(non_art_tokens)
-    art_features /= art_features.norm(dim=-1, keepdim=True)
-    non_art_features /= non_art_features.norm(dim=-1, keepdim=True)
-
-    # Compare similarities
-    art_sim = (image_features @ art_features.T).squeeze(0).max().item()
-    non_art_sim = (image_features @ non_art_features.T).squeeze(0).max().item()
+    # Compare similarities against the precomputed prompt embeddings
+    art_sim = (image_features @ prompts.art.T).squeeze(0).max().item()
+    non_art_sim = (image_features @ prompts.non_art.T).squeeze(0).max().item()
 
     art_sim_round = round(art_sim, 2)
     non_art_sim_round = round(non_art_sim, 2)
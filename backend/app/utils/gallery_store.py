@@ -0,0 +1,258 @@
+import bisect
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import (
+    GALLERY_CACHE_USERS, GALLERY_MEMORY_TTL_SECONDS, GALLERY_STORE_TTL_SECONDS,
+    GALLERY_STORE_MAX_USERS, GALLERY_STORE_PATH,
+)
+from app.db.local_store import LocalStore
+from app.db.supabase import supabase
+from app.utils.lru_cache import LRUCache
+
+
+def _sort_key(timestamp: Optional[str]) -> str:
+    # Rows come back from the DB with a UTC offset and from save_prediction
+    # without one; compare the naive UTC part.
+    timestamp = str(timestamp or "")
+    for suffix in ("+00:00", "Z"):
+        if timestamp.endswith(suffix):
+            return timestamp[: -len(suffix)]
+    return timestamp
+
+
+# -------------------- ONE USER'S GALLERY --------------------
+class UserGallery:
+    """
+    A user's predictions grouped by style, deduplicated by image hash.
+
+    Matches the original full-scan grouping: walking the history newest
+    first, an image hash is shown once, under the style of its newest row.
+    Every row is kept (by image URL) so that deleting the visible copy of a
+    duplicate brings back the next newest one. Style groups are sorted
+    lists, so reading a page costs O(page), not O(history).
+    """
+
+    def __init__(self, rows: Optional[Dict[str, list]] = None):
+        self.rows: Dict[str, list] = {}                   # image_url -> [timestamp, style, image_hash]
+        self._by_hash: Dict[Any, List[Tuple[str, str]]] = {}   # hash -> sorted [(key, url)]
+        self._styles: Dict[str, List[Tuple[str, str]]] = {}    # style -> sorted [(key, url)], visible only
+        for url, (timestamp, style, image_hash) in (rows or {}).items():
+            self.add(url, timestamp, style, image_hash)
+
+    def _show(self, url: str):
+        timestamp, style, _ = self.rows[url]
+        bisect.insort(self._styles.setdefault(style, []), (_sort_key(timestamp), url))
+
+    def _hide(self, url: str):
+        timestamp, style, _ = self.rows[url]
+        entries = self._styles.get(style, [])
+        index = bisect.bisect_left(entries, (_sort_key(timestamp), url))
+        if index < len(entries) and entries[index][1] == url:
+            entries.pop(index)
+        if not entries:
+            self._styles.pop(style, None)
+
+    def add(self, url: str, timestamp: str, style: str, image_hash: Optional[str]):
+        if not url or url in self.rows:
+            return  # already applied (e.g. rebuilt from the DB after the insert)
+        self.rows[url] = [timestamp, style, image_hash]
+        copies = self._by_hash.setdefault(image_hash, [])
+        newest = copies[-1][1] if copies else None
+        bisect.insort(copies, (_sort_key(timestamp), url))
+        if copies[-1][1] == url:
+            if newest is not None:
+                self._hide(newest)
+            self._show(url)
+
+    def remove(self, url: str):
+        if url not in self.rows:
+            return
+        image_hash = self.rows[url][2]
+        copies = self._by_hash.get(image_hash, [])
+        was_visible = bool(copies) and copies[-1][1] == url
+        if was_visible:
+            self._hide(url)
+        copies[:] = [entry for entry in copies if entry[1] != url]
+        del self.rows[url]
+        if not copies:
+            self._by_hash.pop(image_hash, None)
+        elif was_visible:
+            self._show(copies[-1][1])
+
+    def page(self, style: Optional[str] = None, offset: int = 0,
+             limit: Optional[int] = None) -> Tuple[Dict[str, List[str]], Dict[str, int]]:
+        """Returns ``({style: [urls newest first]}, {style: total})``."""
+        if style is not None:
+            styles = [style] if style in self._styles else []
+        else:
+            # Groups appear in order of their newest image, as before
+            styles = sorted(self._styles, key=lambda s: self._styles[s][-1][0], reverse=True)
+
+        grouped, counts = {}, {}
+        for name in styles:
+            entries = self._styles[name]
+            end = len(entries) - offset
+            start = 0 if limit is None else max(0, end - limit)
+            grouped[name] = [url for _, url in reversed(entries[start:max(0, end)])]
+            counts[name] = len(entries)
+        return grouped, counts
+
+
+# -------------------- STORE --------------------
+class GalleryStore:
+    """
+    Materialized galleries: an LRU of ``UserGallery`` objects in front of a
+    LocalStore holding each user's rows. A user missing from both is built
+    once from a full scan of their predictions; after that, saves and
+    deletes update it in place.
+
+    The LocalStore is the copy every worker shares. Writes are a
+    read-modify-write inside one SQLite transaction, and in-memory copies
+    are tagged with the store version they came from, so a worker never
+    overwrites or serves past another worker's changes. Without a store
+    the memory copy is the only one (single process).
+    """
+
+    def __init__(self, fetch_rows, memory: LRUCache, store: Optional[LocalStore] = None,
+                 store_ttl_seconds: Optional[float] = None):
+        self._fetch_rows = fetch_rows
+        self.memory = memory  # user -> (store version, UserGallery)
+        self.store = store
+        self.store_ttl_seconds = store_ttl_seconds
+        self._locks = [threading.Lock() for _ in range(64)]
+        self._stats_lock = threading.Lock()
+        self.rebuilds = 0
+        self.store_loads = 0
+        self.updates = 0
+
+    def _lock(self, user_email: str) -> threading.Lock:
+        return self._locks[hash(user_email) % len(self._locks)]
+
+    def _count(self, field: str):
+        with self._stats_lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _build(self, user_email: str) -> UserGallery:
+        gallery = UserGallery()
+        for row in self._fetch_rows(user_email):
+            gallery.add(row.get("image_url"), row.get("timestamp"), row.get("style"), row.get("image_hash"))
+        self._count("rebuilds")
+        return gallery
+
+    def _load(self, user_email: str) -> UserGallery:
+        cached = self.memory.get(user_email)
+        if self.store is None:
+            if cached is None:
+                cached = (None, self._build(user_email))
+                self.memory.set(user_email, cached)
+            return cached[1]
+
+        try:
+            version = self.store.version(user_email)
+            if version is not None and cached is not None and cached[0] == version:
+                return cached[1]
+            rows, version = self.store.get_versioned(user_email) if version is not None else (None, None)
+        except Exception as e:
+            print("[GALLERY WARNING] Store read failed:", e)
+            return cached[1] if cached is not None else self._build(user_email)
+        if rows is not None:
+            gallery = UserGallery(rows)
+            self.memory.set(user_email, (version, gallery))
+            self._count("store_loads")
+            return gallery
+
+        gallery = self._build(user_email)
+        try:
+            # Another worker may have stored one meanwhile; theirs wins
+            version = self.store.update(
+                user_email, lambda current, _: gallery.rows if current is None else None,
+                ttl_seconds=self.store_ttl_seconds,
+            )
+        except Exception as e:
+            print("[GALLERY WARNING] Store write failed:", e)
+            return gallery
+        if version is None:
+            return self._load(user_email)
+        self.memory.set(user_email, (version, gallery))
+        return gallery
+
+    def _apply(self, user_email: str, change: Callable[[UserGallery], None]):
+        """Applies ``change`` to the user's gallery if it is materialized; caller holds the user lock."""
+        if self.store is None:
+            cached = self.memory.get(user_email)
+            if cached is not None:
+                change(cached[1])
+                self._count("updates")
+            return
+
+        changed = []
+
+        def modify(rows, version):
+            if rows is None:
+                return None  # not materialized: the first read builds it from the DB, rows included
+            cached = self.memory.get(user_email)
+            gallery = cached[1] if cached is not None and cached[0] == version else UserGallery(rows)
+            change(gallery)
+            changed.append(gallery)
+            return gallery.rows
+
+        try:
+            version = self.store.update(user_email, modify, ttl_seconds=self.store_ttl_seconds)
+        except Exception as e:
+            print("[GALLERY WARNING] Store write failed:", e)
+            self.memory.pop(user_email)  # may have been changed in place; reload next time
+            return
+        if version is None:
+            self.memory.pop(user_email)
+            return
+        self.memory.set(user_email, (version, changed[0]))
+        self._count("updates")
+
+    def page(self, user_email: str, style: Optional[str] = None, offset: int = 0,
+             limit: Optional[int] = None) -> Tuple[Dict[str, List[str]], Dict[str, int]]:
+        with self._lock(user_email):
+            return self._load(user_email).page(style, offset, limit)
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]]):
+        """Applies newly inserted prediction rows to galleries that are materialized."""
+        by_user: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_user.setdefault(row["user_email"], []).append(row)
+        for user_email, user_rows in by_user.items():
+            def change(gallery: UserGallery, user_rows=user_rows):
+                for row in user_rows:
+                    gallery.add(row.get("image_url"), row.get("timestamp"), row.get("style"), row.get("image_hash"))
+            with self._lock(user_email):
+                self._apply(user_email, change)
+
+    def remove_row(self, row: Dict[str, Any]):
+        user_email = row.get("user_email")
+        if not user_email:
+            return
+        with self._lock(user_email):
+            self._apply(user_email, lambda gallery: gallery.remove(row.get("image_url")))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "stored_users": self.store.count() if self.store is not None else None,
+            "rebuilds": self.rebuilds,
+            "store_loads": self.store_loads,
+            "updates": self.updates,
+        }
+
+
+def _fetch_gallery_rows(user_email: str) -> List[Dict[str, Any]]:
+    return supabase.table("predictions")\
+        .select("style, image_url, image_hash, timestamp")\
+        .eq("user_email", user_email)\
+        .execute().data or []
+
+
+gallery_store = GalleryStore(
+    _fetch_gallery_rows,
+    LRUCache(GALLERY_CACHE_USERS, GALLERY_MEMORY_TTL_SECONDS),
+    LocalStore(GALLERY_STORE_PATH, table="galleries", max_entries=GALLERY_STORE_MAX_USERS),
+    GALLERY_STORE_TTL_SECONDS,
+)
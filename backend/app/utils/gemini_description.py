@@ -1,20 +1,78 @@
-import google.generativeai as genai
 import os
+import io
+import time
 import base64
+import asyncio
+from typing import Dict, Tuple, Union
 from PIL import Image
-import io
+from app.core.config import (
+    DESCRIPTION_PROMPT_VERSION, DESCRIPTION_CACHE_SIZE, DESCRIPTION_CACHE_PATH,
+    DESCRIPTION_CACHE_DISK_SIZE, DESCRIPTION_CACHE_TTL_SECONDS,
+    GEMINI_MAX_CONCURRENCY, GEMINI_TIMEOUT_SECONDS, GEMINI_FAKE, GEMINI_FAKE_LATENCY_MS,
+)
+from app.core.executor import run_io
+from app.core.lifecycle import models
+from app.db.local_store import LocalStore
+from app.utils.lru_cache import LRUCache
+from app.core.metrics import stage, cache_hits_total, cache_misses_total, errors_total
+
+
+# -------------------- FAKE CLIENT --------------------
+class FakeGeminiResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """
+    Offline stand-in for ``genai.GenerativeModel`` with a fixed latency.
+
+    Enabled with ``GEMINI_FAKE=1`` so /predict/ can be load-tested without
+    network access or API quota.
+    """
+
+    def __init__(self, latency_ms: float = GEMINI_FAKE_LATENCY_MS):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def generate_content(self, parts):
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000.0)
+        prompt = next((p for p in parts if isinstance(p, str)), "")
+        style = prompt.split('"')[1] if '"' in prompt else "unknown"
+        return FakeGeminiResponse(
+            f"A {style} painting described by the offline Gemini stand-in (call #{self.calls})."
+        )
+
 
 # Set up API
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel("models/gemini-1.5-flash")  # ✅ Vision model
+def load_gemini():
+    if GEMINI_FAKE:
+        return FakeGeminiModel()
+
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    return genai.GenerativeModel("models/gemini-1.5-flash")  # ✅ Vision model
+
+
+# Descriptions fall back to template text, so Gemini doesn't gate readiness
+models.register("gemini", load_gemini, required=False)
 
 def image_to_base64(image: Image.Image) -> str:
     buffer = io.BytesIO()
     image.save(buffer, format="JPEG")
     return base64.b64encode(buffer.getvalue()).decode("utf-8")
 
-def generate_dynamic_description(image: Image.Image, style: str) -> str:
-    image_b64 = image_to_base64(image)
+def fallback_description(style: str) -> str:
+    return f"This {style} painting showcases unique visual qualities that provoke emotion and insight."
+
+def _call_gemini(image: Union[Image.Image, bytes], style: str) -> str:
+    # Already-encoded JPEG bytes are sent as-is instead of re-encoding
+    if isinstance(image, bytes):
+        image_b64 = base64.b64encode(image).decode("utf-8")
+    else:
+        image_b64 = image_to_base64(image)
 
     prompt = f"""
     You are an experienced art curator. Please analyze and describe the uploaded painting in a human, poetic tone.
@@ -24,15 +82,85 @@ def generate_dynamic_description(image: Image.Image, style: str) -> str:
     Your output should be thoughtful, elegant, and rich with interpretation. Limit to 200 words.
     """
 
+    response = models.get("gemini").generate_content([
+        {
+            "mime_type": "image/jpeg",
+            "data": image_b64
+        },
+        prompt
+    ])
+    return response.text.strip()
+
+def generate_dynamic_description(image: Image.Image, style: str) -> str:
+    try:
+        return _call_gemini(image, style)
+    except Exception as e:
+        print("[Gemini Vision Error]", e)
+        return fallback_description(style)
+
+
+# -------------------- CACHED DESCRIPTIONS --------------------
+description_cache = LRUCache(DESCRIPTION_CACHE_SIZE)
+description_store = LocalStore(DESCRIPTION_CACHE_PATH, table="descriptions", max_entries=DESCRIPTION_CACHE_DISK_SIZE)
+
+_inflight: Dict[str, asyncio.Task] = {}
+_gemini_slots = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+
+def inflight_descriptions() -> int:
+    return len(_inflight)
+
+
+def description_key(image_hash: str, style: str) -> str:
+    return f"{image_hash}:{style}:{DESCRIPTION_PROMPT_VERSION}"
+
+
+async def _fetch_description(key: str, image: Union[Image.Image, bytes], style: str) -> str:
+    stored = await run_io(description_store.get, key)
+    if stored is not None:
+        cache_hits_total.inc(cache="description_store")
+        description_cache.set(key, stored)
+        return stored
+
+    async with _gemini_slots:
+        with stage("gemini"):
+            description = await run_io(_call_gemini, image, style)
+
+    description_cache.set(key, description)
+    await run_io(description_store.set, key, description, DESCRIPTION_CACHE_TTL_SECONDS)
+    return description
+
+
+async def describe_painting(image: Union[Image.Image, bytes], style: str, image_hash: str) -> Tuple[str, bool]:
+    """
+    Returns ``(description, from_model)`` for a painting (PIL image or JPEG bytes).
+
+    Repeat requests for the same (hash, style, prompt version) are served from
+    the cache, concurrent ones share a single Gemini call, and anything slower
+    than GEMINI_TIMEOUT_SECONDS gets the template text (``from_model=False``).
+    A timed-out call keeps running and fills the cache for the next request.
+    """
+    key = description_key(image_hash, style)
+    cached = description_cache.get(key)
+    if cached is not None:
+        cache_hits_total.inc(cache="description")
+        return cached, True
+    cache_misses_total.inc(cache="description")
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_description(key, image, style))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _inflight.pop(key, None))
+        # Consume the exception if every waiter has already timed out.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
     try:
-        response = model.generate_content([
-            {
-                "mime_type": "image/jpeg",
-                "data": image_b64
-            },
-            prompt
-        ])
-        return response.text.strip()
+        return await asyncio.wait_for(asyncio.shield(task), GEMINI_TIMEOUT_SECONDS), True
+    except asyncio.TimeoutError:
+        print(f"[GEMINI] Timed out after {GEMINI_TIMEOUT_SECONDS}s, using template text.")
+        errors_total.inc(where="gemini_timeout")
     except Exception as e:
         print("[Gemini Vision Error]", e)
-        return f"This {style} painting showcases unique visual qualities that provoke emotion and insight."
+        errors_total.inc(where="gemini")
+    return fallback_description(style), False
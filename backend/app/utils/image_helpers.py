@@ -1,9 +1,28 @@
 # utils/image_helpers.py
+import io
 from PIL import Image
 import imagehash
+from app.core.config import JPEG_QUALITY, THUMBNAIL_MAX_SIDE, THUMBNAIL_QUALITY
 
 def get_image_hash(image: Image.Image) -> str:
     """
     Returns a perceptual hash of the image as a string.
     """
     return str(imagehash.average_hash(image))  # You can also try phash or dhash
+
+def encode_jpeg(image: Image.Image, quality: int = JPEG_QUALITY) -> bytes:
+    """
+    Encodes the image to JPEG bytes. Encode once and reuse the bytes.
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+def encode_thumbnail(image: Image.Image, max_side: int = THUMBNAIL_MAX_SIDE,
+                     quality: int = THUMBNAIL_QUALITY) -> bytes:
+    """
+    Encodes a downscaled JPEG preview with the longest side at most max_side.
+    """
+    thumb = image.copy()
+    thumb.thumbnail((max_side, max_side), Image.BILINEAR)
+    return encode_jpeg(thumb, quality)
@@ -0,0 +1,85 @@
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from app.core.config import (
+    PREDICTION_CACHE_ENABLED, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_DISK_SIZE,
+    PREDICTION_CACHE_TTL_SECONDS, PREDICTION_CACHE_PATH,
+)
+from app.db.local_store import LocalStore
+from app.utils.lru_cache import LRUCache
+
+
+def content_digest(contents: bytes) -> str:
+    """Exact digest of the uploaded bytes, cheap enough to compute before decoding."""
+    return hashlib.sha256(contents).hexdigest()
+
+
+# -------------------- PREDICTION CACHE --------------------
+class PredictionCache:
+    """
+    Remembers model outputs for uploads we've already seen.
+
+    Entries are keyed by ``content_digest`` and hold the crop box, art
+    verdict, top-3 predictions, description and perceptual hash. Lookups hit
+    an in-memory LRU first and fall back to a local SQLite store that
+    survives restarts.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, store: Optional[LocalStore] = None):
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUCache(max_entries, ttl_seconds)
+        self.store = store
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _count(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.memory.get(key)
+        if entry is None and self.store is not None:
+            try:
+                entry = self.store.get(key)
+            except Exception as e:
+                print("[CACHE WARNING] Prediction store read failed:", e)
+                entry = None
+            if entry is not None:
+                self.memory.set(key, entry)
+                self._count("disk_hits")
+
+        self._count("hits" if entry is not None else "misses")
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        self.memory.set(key, entry)
+        if self.store is not None:
+            try:
+                self.store.set(key, entry, ttl_seconds=self.ttl_seconds)
+            except Exception as e:
+                print("[CACHE WARNING] Prediction store write failed:", e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "max_memory_entries": self.memory.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+prediction_cache = None
+if PREDICTION_CACHE_ENABLED:
+    prediction_cache = PredictionCache(
+        PREDICTION_CACHE_SIZE,
+        PREDICTION_CACHE_TTL_SECONDS,
+        LocalStore(PREDICTION_CACHE_PATH, table="predictions", max_entries=PREDICTION_CACHE_DISK_SIZE),
+    )
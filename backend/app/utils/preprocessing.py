@@ -0,0 +1,129 @@
+import io
+import math
+from typing import Tuple
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from PIL import Image
+
+from app.core.config import DECODE_MAX_SIDE
+
+# -------------------- CONSTANTS --------------------
+IMAGENET_MEAN = torch.tensor([0.485, 0.456, 0.406]).view(3, 1, 1)
+IMAGENET_STD = torch.tensor([0.229, 0.224, 0.225]).view(3, 1, 1)
+CLIP_MEAN = torch.tensor([0.48145466, 0.4578275, 0.40821073]).view(3, 1, 1)
+CLIP_STD = torch.tensor([0.26862954, 0.26130258, 0.27577711]).view(3, 1, 1)
+
+CLASSIFIER_SIZE = 224
+CLIP_SIZE = 224
+YOLO_PAD_VALUE = 114 / 255.0
+
+
+# -------------------- DECODE --------------------
+def decode_image(contents: bytes, max_side: int = DECODE_MAX_SIDE) -> Image.Image:
+    """
+    Decodes an upload to RGB with the longest side capped at ``max_side``
+    (0 keeps the original resolution).
+
+    For JPEGs, ``draft`` lets libjpeg decode at 1/2, 1/4 or 1/8 scale
+    directly, so a 12 MP phone photo never gets materialized at full size.
+    The capped decode is for model inputs; copies that are stored or shown
+    to users are decoded again at full size (see ``source_size``).
+    """
+    image = Image.open(io.BytesIO(contents))
+    if image.format == "JPEG" and max_side:
+        image.draft("RGB", (max_side, max_side))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if max_side and max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.BILINEAR)
+    return image
+
+
+def source_size(contents: bytes) -> Tuple[int, int]:
+    """(width, height) of the upload, read from its header without decoding pixels."""
+    with Image.open(io.BytesIO(contents)) as image:
+        return image.size
+
+
+def scale_box(box, from_size: Tuple[int, int], to_size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """Maps an (x1, y1, x2, y2) box between two resolutions of the same image."""
+    sx, sy = to_size[0] / from_size[0], to_size[1] / from_size[1]
+    x1, y1, x2, y2 = box
+    return (
+        int(min(max(round(x1 * sx), 0), to_size[0])),
+        int(min(max(round(y1 * sy), 0), to_size[1])),
+        int(min(max(round(x2 * sx), 0), to_size[0])),
+        int(min(max(round(y2 * sy), 0), to_size[1])),
+    )
+
+
+def to_uint8_tensor(image: Image.Image) -> torch.Tensor:
+    """(3, H, W) uint8 view of an RGB image; the shared input for every model."""
+    return torch.from_numpy(np.array(image)).permute(2, 0, 1)
+
+
+def crop_tensor(pixels: torch.Tensor, box: Tuple[int, int, int, int]) -> torch.Tensor:
+    x1, y1, x2, y2 = box
+    return pixels[:, y1:y2, x1:x2]
+
+
+def _resize(pixels: torch.Tensor, size: Tuple[int, int], mode: str) -> torch.Tensor:
+    batch = pixels.unsqueeze(0).float()
+    return F.interpolate(batch, size=size, mode=mode, antialias=True, align_corners=False)[0]
+
+
+# -------------------- MODEL INPUTS --------------------
+def classifier_input(pixels: torch.Tensor) -> torch.Tensor:
+    """Matches the classifier transform: 224x224 resize, ImageNet normalization."""
+    resized = _resize(pixels, (CLASSIFIER_SIZE, CLASSIFIER_SIZE), "bilinear") / 255.0
+    return (resized - IMAGENET_MEAN) / IMAGENET_STD
+
+
+def clip_input(pixels: torch.Tensor) -> torch.Tensor:
+    """Matches open_clip's preprocess: shortest side to 224 (bicubic), center crop, CLIP normalization."""
+    _, h, w = pixels.shape
+    scale = CLIP_SIZE / min(h, w)
+    new_h, new_w = max(CLIP_SIZE, round(h * scale)), max(CLIP_SIZE, round(w * scale))
+    resized = _resize(pixels, (new_h, new_w), "bicubic").clamp(0, 255) / 255.0
+    top, left = (new_h - CLIP_SIZE) // 2, (new_w - CLIP_SIZE) // 2
+    cropped = resized[:, top:top + CLIP_SIZE, left:left + CLIP_SIZE]
+    return (cropped - CLIP_MEAN) / CLIP_STD
+
+
+def yolo_input(pixels: torch.Tensor, imgsz: int = 640, stride: int = 32):
+    """
+    Letterboxes to fit ``imgsz`` with sides padded to a multiple of ``stride``.
+
+    Returns ``(batch, scale, (pad_x, pad_y))``; ``batch`` is (1, 3, H, W)
+    float in [0, 1], which Ultralytics consumes without its own preprocessing.
+    Use ``unletterbox_box`` to map detections back to ``pixels`` coordinates.
+    """
+    _, h, w = pixels.shape
+    scale = min(imgsz / h, imgsz / w)
+    new_h, new_w = max(1, round(h * scale)), max(1, round(w * scale))
+    resized = _resize(pixels, (new_h, new_w), "bilinear").clamp(0, 255) / 255.0
+
+    target_h = math.ceil(new_h / stride) * stride
+    target_w = math.ceil(new_w / stride) * stride
+    pad_y, pad_x = (target_h - new_h) // 2, (target_w - new_w) // 2
+    padded = F.pad(
+        resized,
+        (pad_x, target_w - new_w - pad_x, pad_y, target_h - new_h - pad_y),
+        value=YOLO_PAD_VALUE,
+    )
+    return padded.unsqueeze(0), scale, (pad_x, pad_y)
+
+
+def unletterbox_box(box, scale: float, pad: Tuple[int, int], size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """Maps an (x1, y1, x2, y2) box from letterboxed to original (width, height) coordinates."""
+    pad_x, pad_y = pad
+    width, height = size
+    x1, y1, x2, y2 = box
+    return (
+        int(min(max((x1 - pad_x) / scale, 0), width)),
+        int(min(max((y1 - pad_y) / scale, 0), height)),
+        int(min(max((x2 - pad_x) / scale, 0), width)),
+        int(min(max((y2 - pad_y) / scale, 0), height)),
+    )
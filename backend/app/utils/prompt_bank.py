@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+import torch
+
+
+class PromptSet(NamedTuple):
+    version: str           # hash of the prompt texts
+    art: torch.Tensor      # (n_art, dim), L2-normalized
+    non_art: torch.Tensor  # (n_non_art, dim), L2-normalized
+
+
+def prompt_set_hash(art_prompts: List[str], non_art_prompts: List[str]) -> str:
+    payload = json.dumps({"art": list(art_prompts), "non_art": list(non_art_prompts)})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+# -------------------- PROMPT BANK --------------------
+class PromptBank:
+    """
+    Encodes CLIP text prompts once and keeps the normalized embeddings around.
+
+    Embeddings are persisted to ``cache_dir`` as ``<model>-<hash>.pt`` so a
+    restart (or another worker) only has to read them back. If ``prompts_path``
+    is set, the file is watched and a changed prompt set is encoded and swapped
+    in on the next ``current()`` call.
+    """
+
+    def __init__(
+        self,
+        clip_model,
+        tokenizer,
+        model_name: str,
+        cache_dir: str,
+        device,
+        default_art: List[str],
+        default_non_art: List[str],
+        prompts_path: Optional[str] = None,
+        check_interval: float = 5.0,
+    ):
+        self.clip_model = clip_model
+        self.tokenizer = tokenizer
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.device = device
+        self.default_art = list(default_art)
+        self.default_non_art = list(default_non_art)
+        self.prompts_path = prompts_path
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._current: Optional[PromptSet] = None
+        self._prompts_mtime = None
+        self._last_check = 0.0
+
+    def _cache_file(self, version: str) -> str:
+        safe_name = self.model_name.replace("/", "_")
+        return os.path.join(self.cache_dir, f"{safe_name}-{version}.pt")
+
+    @torch.no_grad()
+    def _encode(self, prompts: List[str]) -> torch.Tensor:
+        tokens = self.tokenizer(prompts).to(self.device)
+        features = self.clip_model.encode_text(tokens)
+        return features / features.norm(dim=-1, keepdim=True)
+
+    def load(self, art_prompts: List[str], non_art_prompts: List[str]) -> PromptSet:
+        """Make the given prompt set current, encoding it only if it isn't cached."""
+        version = prompt_set_hash(art_prompts, non_art_prompts)
+        if self._current is not None and self._current.version == version:
+            return self._current
+
+        path = self._cache_file(version)
+        prompt_set = None
+        if os.path.exists(path):
+            try:
+                saved = torch.load(path, map_location=self.device)
+                prompt_set = PromptSet(version, saved["art"], saved["non_art"])
+            except Exception as e:
+                print("[PROMPT BANK WARNING] Ignoring unreadable cache file:", path, e)
+
+        if prompt_set is None:
+            prompt_set = PromptSet(version, self._encode(art_prompts), self._encode(non_art_prompts))
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = path + ".tmp"
+                torch.save({
+                    "model": self.model_name,
+                    "art_prompts": list(art_prompts),
+                    "non_art_prompts": list(non_art_prompts),
+                    "art": prompt_set.art.cpu(),
+                    "non_art": prompt_set.non_art.cpu(),
+                }, tmp_path)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print("[PROMPT BANK WARNING] Could not persist embeddings:", e)
+
+        self._current = prompt_set
+        print(f"[PROMPT BANK] Loaded prompt set {version} for {self.model_name}")
+        return prompt_set
+
+    def _read_prompts_file(self):
+        with open(self.prompts_path, "r") as f:
+            data = json.load(f)
+        return data["art"], data["non_art"]
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if self._current is not None and now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        if not self.prompts_path or not os.path.exists(self.prompts_path):
+            if self._current is None:
+                self.load(self.default_art, self.default_non_art)
+            return
+
+        mtime = os.path.getmtime(self.prompts_path)
+        if self._current is not None and mtime == self._prompts_mtime:
+            return
+        try:
+            art, non_art = self._read_prompts_file()
+            self.load(art, non_art)
+            self._prompts_mtime = mtime
+        except Exception as e:
+            # Keep serving the previous prompt set if the new one is broken.
+            print("[PROMPT BANK WARNING] Failed to reload prompts:", e)
+            if self._current is None:
+                self.load(self.default_art, self.default_non_art)
+
+    def current(self) -> PromptSet:
+        with self._lock:
+            self._maybe_reload()
+            return self._current
@@ -1,14 +1,48 @@
 from db import supabase
 import uuid
 import os 
-def save_prediction(user_email, style, image_url, timestamp, confidence, description, storage_path, image_hash):
-    # Ensure user exists
-    user = supabase.table("users").select("*").eq("email", user_email).execute()
-    if not user.data:
-        supabase.table("users").insert({"email": user_email}).execute()
+from app.core.config import (
+    PREDICTION_WRITE_BEHIND, PREDICTION_SPOOL_DIR, PREDICTION_FLUSH_MAX_ROWS,
+    PREDICTION_FLUSH_INTERVAL_SECONDS, PREDICTION_SPOOL_FSYNC, KNOWN_USERS_CACHE_SIZE,
+)
+from app.core.metrics import stage_seconds
+from app.db.prediction_writer import PredictionWriter
+from app.utils.lru_cache import LRUCache
+from app.utils.gallery_store import gallery_store
+from app.utils.user_cache import invalidate_user
 
-    # Save prediction
-    supabase.table("predictions").insert({
+# Emails already known to exist in the users table
+known_users = LRUCache(KNOWN_USERS_CACHE_SIZE)
+
+
+def _after_flush(rows, seconds):
+    stage_seconds.observe(seconds, stage="db_flush")
+    gallery_store.add_rows(rows)
+    # Cached history/details pages are stale once the rows are in the DB
+    for user_email in {row["user_email"] for row in rows}:
+        invalidate_user(user_email, "predict")
+
+
+prediction_writer = PredictionWriter(
+    lambda: supabase,
+    PREDICTION_SPOOL_DIR,
+    max_rows=PREDICTION_FLUSH_MAX_ROWS,
+    interval=PREDICTION_FLUSH_INTERVAL_SECONDS,
+    fsync=PREDICTION_SPOOL_FSYNC,
+    known_users=known_users,
+    on_flush=_after_flush,
+) if PREDICTION_WRITE_BEHIND else None
+
+
+def ensure_user(user_email):
+    if known_users.get(user_email) is not None:
+        return
+    supabase.table("users").upsert({"email": user_email}, on_conflict="email", ignore_duplicates=True).execute()
+    known_users.set(user_email, True)
+
+
+def save_prediction(user_email, style, image_url, timestamp, confidence, description, storage_path, image_hash):
+    row = {
         "user_email": user_email,
         "style": style,
         "image_url": image_url,
@@ -17,7 +51,20 @@ def save_prediction(user_email, style, image_url, timestamp, confidence, descrip
         "description": description,
         "storage_path": storage_path,
         "image_hash": image_hash
-    }).execute()
+    }
+
+    # Write-behind: spool locally, bulk insert in the background
+    if prediction_writer is not None:
+        prediction_writer.enqueue(row)
+        return
+
+    # Ensure user exists
+    ensure_user(user_email)
+
+    # Save prediction
+    supabase.table("predictions").insert(row).execute()
+    gallery_store.add_rows([row])
+    invalidate_user(user_email, "predict")
 
 def upload_image_to_storage(file_bytes, filename):
     bucket = os.getenv("SUPABASE_BUCKET")
@@ -25,4 +72,3 @@ def upload_image_to_storage(file_bytes, filename):
     supabase.storage.from_(bucket).upload(unique_name, file_bytes)
     public_url = supabase.storage.from_(bucket).get_public_url(unique_name)
     return public_url, unique_name  # ⬅️ return both
-
@@ -0,0 +1,254 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import (
+    USER_CACHE_ENABLED, USER_CACHE_BACKEND, USER_CACHE_MAX_BYTES, USER_CACHE_TTL_SECONDS,
+    USER_CACHE_PATH, USER_CACHE_REDIS_URL,
+)
+from app.core.metrics import metrics
+from app.db.local_store import LocalStore
+
+# Bookkeeping per entry on top of key and value, for the memory budget
+_ENTRY_OVERHEAD_BYTES = 120
+
+
+# -------------------- BACKENDS --------------------
+# A backend stores strings with a TTL: get(key), set(key, value, ttl), delete(key).
+class MemoryBackend:
+    """Per-process LRU bounded by the total size of keys and values."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(1, max_bytes)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(key: str, value: str) -> int:
+        return len(key) + len(value) + _ENTRY_OVERHEAD_BYTES
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None):
+        size = self._size(key, value)
+        if size > self.max_bytes:
+            return  # would evict everything else; not worth caching
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._drop(key)
+            self._data[key] = (expires_at, value)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._drop(key)
+
+    def _drop(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= self._size(key, entry[1])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self.bytes,
+                    "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class LocalStoreBackend:
+    """SQLite file shared by every worker process on the host (and a stand-in for Redis)."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int = 100000):
+        self.store = LocalStore(path, table="user_cache", max_entries=max_entries)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.store.get(key)
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None):
+        self.store.set(key, value, ttl_seconds=ttl_seconds)
+
+    def delete(self, key: str):
+        self.store.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": self.store.count()}
+
+
+class RedisBackend:
+    """Shared across hosts. Size limits are Redis's job (maxmemory + allkeys-lru)."""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None):
+        self.client.set(key, value, ex=max(1, int(ttl_seconds)) if ttl_seconds else None)
+
+    def delete(self, key: str):
+        self.client.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"url": USER_CACHE_REDIS_URL.split("@")[-1]}
+
+
+def create_backend(kind: str = USER_CACHE_BACKEND):
+    if kind == "redis":
+        if not USER_CACHE_REDIS_URL:
+            print("[USER CACHE WARNING] USER_CACHE_REDIS_URL is not set; using the memory backend.")
+        else:
+            try:
+                return RedisBackend(USER_CACHE_REDIS_URL)
+            except ImportError:
+                print("[USER CACHE WARNING] redis is not installed; using the memory backend.")
+    elif kind == "sqlite":
+        return LocalStoreBackend(USER_CACHE_PATH)
+    return MemoryBackend(USER_CACHE_MAX_BYTES)
+
+
+# -------------------- METRICS --------------------
+user_cache_lookups = metrics.counter(
+    "painting_user_cache_lookups_total", "User data cache lookups by route and result", ["route", "result"]
+)
+user_cache_saved_round_trips = metrics.counter(
+    "painting_user_cache_saved_round_trips_total", "Supabase queries answered from the user data cache", ["route"]
+)
+user_cache_invalidations = metrics.counter(
+    "painting_user_cache_invalidations_total", "Per-user invalidations by cause", ["reason"]
+)
+
+
+def _hit_ratios() -> Dict[tuple, float]:
+    ratios = {}
+    for route in list(user_cache.routes) if user_cache is not None else []:
+        hits = user_cache_lookups.value(route=route, result="hit")
+        total = hits + user_cache_lookups.value(route=route, result="miss")
+        ratios[(route,)] = round(hits / total, 4) if total else 0.0
+    return ratios
+
+
+metrics.gauge("painting_user_cache_hit_ratio", "Hit ratio of the user data cache", ["route"], collect=_hit_ratios)
+
+
+# -------------------- USER CACHE --------------------
+class UserCache:
+    """
+    Read-through cache for per-user API responses.
+
+    Keys carry a per-user generation token. ``invalidate(user)`` replaces
+    the token, so every entry cached for that user becomes unreachable at
+    once, on any backend and without scanning keys. A load that raced an
+    invalidation is written under the old token and is never served. A
+    missing token (expired or evicted) is replaced by a fresh one for the
+    same reason.
+    """
+
+    def __init__(self, backend, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.routes = set()
+
+    def _generation(self, user_email: str) -> str:
+        key = f"gen:{user_email}"
+        generation = self.backend.get(key)
+        if generation is None:
+            generation = self._new_generation(user_email)
+        return generation
+
+    def _new_generation(self, user_email: str) -> str:
+        generation = uuid.uuid4().hex[:12]
+        # Outlives every entry written under it
+        self.backend.set(f"gen:{user_email}", generation, ttl_seconds=self.ttl_seconds * 2)
+        return generation
+
+    def get_or_load(self, route: str, user_email: str, variant: str, loader: Callable[[], Any],
+                    round_trips: int = 1, cacheable: Callable[[Any], bool] = lambda value: True) -> Any:
+        """Returns the cached value for (route, user, variant) or calls ``loader`` (blocking)."""
+        self.routes.add(route)
+        try:
+            key = f"{route}:{user_email}:{self._generation(user_email)}:{variant}"
+            cached = self.backend.get(key)
+        except Exception as e:
+            print("[USER CACHE WARNING] Read failed:", e)
+            return loader()
+
+        if cached is not None:
+            user_cache_lookups.inc(route=route, result="hit")
+            user_cache_saved_round_trips.inc(round_trips, route=route)
+            return json.loads(cached)
+
+        user_cache_lookups.inc(route=route, result="miss")
+        value = loader()
+        if cacheable(value):
+            try:
+                self.backend.set(key, json.dumps(value, separators=(",", ":"), default=str),
+                                 ttl_seconds=self.ttl_seconds)
+            except Exception as e:
+                print("[USER CACHE WARNING] Write failed:", e)
+        return value
+
+    def invalidate(self, user_email: str, reason: str = "write"):
+        if not user_email:
+            return
+        try:
+            self._new_generation(user_email)
+            user_cache_invalidations.inc(reason=reason)
+        except Exception as e:
+            print("[USER CACHE WARNING] Invalidation failed:", e)
+
+    def stats(self) -> Dict[str, Any]:
+        routes = {}
+        for route in sorted(list(self.routes)):
+            hits = user_cache_lookups.value(route=route, result="hit")
+            misses = user_cache_lookups.value(route=route, result="miss")
+            routes[route] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "saved_round_trips": user_cache_saved_round_trips.value(route=route),
+            }
+        return {"backend": self.backend.name, "ttl_seconds": self.ttl_seconds,
+                "store": self.backend.stats(), "routes": routes}
+
+
+user_cache = UserCache(create_backend(), USER_CACHE_TTL_SECONDS) if USER_CACHE_ENABLED else None
+
+
+def cached_for_user(route: str, user_email: str, variant: str, loader: Callable[[], Any], **kwargs) -> Any:
+    """``user_cache.get_or_load`` that falls through to ``loader`` when the cache is disabled."""
+    if user_cache is None:
+        return loader()
+    return user_cache.get_or_load(route, user_email, variant, loader, **kwargs)
+
+
+def invalidate_user(user_email: str, reason: str = "write"):
+    if user_cache is not None:
+        user_cache.invalidate(user_email, reason)
@@ -1,6 +1,18 @@
 from ultralytics import YOLO
 from PIL import Image
-import numpy as np
+import time
+import threading
+import torch
+import torch.nn.functional as F
+from typing import Union
+from app.core.config import (
+    YOLO_IMGSZ, YOLO_CONF, YOLO_CASCADE, YOLO_CASCADE_IMGSZ, YOLO_CASCADE_COVERAGE,
+    BORDER_FRACTION, BORDER_MIN_STD, BORDER_EDGE_RATIO,
+)
+from app.utils.preprocessing import to_uint8_tensor, yolo_input, unletterbox_box
+from app.core.lifecycle import models
+from app.core.profiler import forward_profiler
+from app.core.inference_pool import inference_pool
 
 # ✅ Load your custom-trained YOLOv8 painting detector
 import os
@@ -9,25 +21,156 @@ import os
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(BASE_DIR, "models", "best.pt")
 
-model = YOLO(MODEL_PATH)
- # <-- Use your fine-tuned weights path here
+THUMBNAIL_SIZE = 64
 
-def detect_and_crop_yolo(image: Image.Image) -> Image.Image:
-    results = model(image, conf=0.05)
-    print(results[0].boxes)
+
+# -------------------- CASCADE STATS --------------------
+class CascadeStats:
+    """Per-stage counters and time spent, so detector savings are visible."""
+
+    STAGES = ("border_check", "yolo_lowres", "yolo_full")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.border_skips = 0
+        self.lowres_accepts = 0
+        self.full_runs = 0
+        self.no_detection = 0
+        self.seconds = {stage: 0.0 for stage in self.STAGES}
+        self.runs = {stage: 0 for stage in self.STAGES}
+
+    def add(self, counter: str = None, stage: str = None, seconds: float = 0.0):
+        with self._lock:
+            if counter:
+                setattr(self, counter, getattr(self, counter) + 1)
+            if stage:
+                self.runs[stage] += 1
+                self.seconds[stage] += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.requests or 1
+            return {
+                "requests": self.requests,
+                "border_skip_rate": round(self.border_skips / total, 4),
+                "lowres_accept_rate": round(self.lowres_accepts / total, 4),
+                "full_run_rate": round(self.full_runs / total, 4),
+                "no_detection": self.no_detection,
+                "stage_runs": dict(self.runs),
+                "stage_avg_ms": {
+                    stage: round(self.seconds[stage] / self.runs[stage] * 1000, 2) if self.runs[stage] else None
+                    for stage in self.STAGES
+                },
+            }
+
+
+cascade_stats = CascadeStats()
+
+
+# -------------------- MODEL --------------------
+def load_yolo() -> YOLO:
+    return YOLO(MODEL_PATH)  # <-- Use your fine-tuned weights path here
+
+
+def _warmup_yolo(model: YOLO):
+    for imgsz in {YOLO_IMGSZ, YOLO_CASCADE_IMGSZ}:
+        batch, _, _ = yolo_input(torch.zeros(3, imgsz, imgsz, dtype=torch.uint8), imgsz)
+        model(batch, conf=YOLO_CONF, verbose=False)
+
+
+models.register("yolo", load_yolo, _warmup_yolo)
+
+
+# -------------------- CASCADE STAGES --------------------
+def frame_is_tight(pixels: torch.Tensor) -> bool:
+    """
+    Cheap check on a 64x64 thumbnail: does the artwork already fill the frame?
+
+    A photo of a painting on a wall has a flat, low-detail border; a tight
+    scan has colour variation and edges right up to the image edge.
+    """
+    thumb = F.interpolate(pixels.unsqueeze(0).float(), size=(THUMBNAIL_SIZE, THUMBNAIL_SIZE), mode="area")[0]
+    gray = thumb.mean(dim=0)
+    edges = torch.zeros_like(gray)
+    edges[:, :-1] += (gray[:, 1:] - gray[:, :-1]).abs()
+    edges[:-1, :] += (gray[1:, :] - gray[:-1, :]).abs()
+
+    band = max(2, int(THUMBNAIL_SIZE * BORDER_FRACTION))
+    border = torch.ones_like(gray, dtype=torch.bool)
+    border[band:-band, band:-band] = False
+
+    border_std = thumb[:, border].std(dim=1).mean().item()
+    border_edges = edges[border].mean().item()
+    interior_edges = edges[~border].mean().item()
+    return border_std >= BORDER_MIN_STD and border_edges >= BORDER_EDGE_RATIO * max(interior_edges, 1e-6)
+
+
+def _largest_box(pixels: torch.Tensor, imgsz: int):
+    _, height, width = pixels.shape
+    batch, scale, pad = yolo_input(pixels, imgsz)
+    results = forward_profiler.run("yolo", models.get("yolo"), batch, conf=YOLO_CONF, imgsz=imgsz, verbose=False)
 
     if not results or not results[0].boxes:
-        raise ValueError("No paintings detected.")
+        return None
 
     # Get all bounding boxes
     boxes = results[0].boxes.xyxy.cpu().numpy()
-    print(results[0].boxes)  # Check what’s being detected
-
+    print(f"[YOLO] Boxes @{imgsz}:", boxes.tolist())  # Check what’s being detected
 
     # Choose the largest box by area
     largest_box = max(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
+    return unletterbox_box(largest_box, scale, pad, (width, height))
+
 
-    x1, y1, x2, y2 = map(int, largest_box)
-    cropped_image = image.crop((x1, y1, x2, y2))
+def run_detector(pixels: torch.Tensor) -> tuple:
+    """YOLO stages of the cascade: low-res pass, then full-res only if needed."""
+    _, height, width = pixels.shape
 
-    return cropped_image
+    if YOLO_CASCADE and YOLO_CASCADE_IMGSZ < YOLO_IMGSZ:
+        start = time.perf_counter()
+        box = _largest_box(pixels, YOLO_CASCADE_IMGSZ)
+        cascade_stats.add(stage="yolo_lowres", seconds=time.perf_counter() - start)
+        if box is not None:
+            x1, y1, x2, y2 = box
+            if (x2 - x1) * (y2 - y1) >= YOLO_CASCADE_COVERAGE * width * height:
+                cascade_stats.add("lowres_accepts")
+                return box
+
+    start = time.perf_counter()
+    box = _largest_box(pixels, YOLO_IMGSZ)
+    cascade_stats.add("full_runs", "yolo_full", time.perf_counter() - start)
+    if box is None:
+        cascade_stats.add("no_detection")
+        raise ValueError("No paintings detected.")
+    return box
+
+
+def detect_painting_box(image: Union[Image.Image, torch.Tensor]) -> tuple:
+    """
+    Returns the (x1, y1, x2, y2) box of the largest detected painting.
+
+    Accepts a PIL image or the shared (3, H, W) uint8 tensor; the letterboxed
+    input is built with torch ops so Ultralytics skips its own preprocessing.
+    Already-framed artwork short-circuits to the full frame (see YOLO_CASCADE).
+    """
+    pixels = to_uint8_tensor(image) if isinstance(image, Image.Image) else image
+    _, height, width = pixels.shape
+    cascade_stats.add("requests")
+
+    if YOLO_CASCADE:
+        start = time.perf_counter()
+        tight = frame_is_tight(pixels)
+        cascade_stats.add(stage="border_check", seconds=time.perf_counter() - start)
+        if tight:
+            cascade_stats.add("border_skips")
+            return (0, 0, width, height)
+
+    # With inference workers, the YOLO stages run (and are counted) there
+    if inference_pool.enabled:
+        return tuple(inference_pool.call("yolo", pixels))
+    return run_detector(pixels)
+
+
+def detect_and_crop_yolo(image: Image.Image) -> Image.Image:
+    return image.crop(detect_painting_box(image))
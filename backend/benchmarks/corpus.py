@@ -0,0 +1,86 @@
+"""
+Deterministic synthetic image corpus for load tests.
+
+"painting" images are layered brush strokes over a colour gradient; "photo"
+images are sky/ground scenes with sensor-like noise and hard-edged shapes.
+Neither is meant to fool the models into a particular answer: the point is
+realistic JPEG sizes, dimensions and decode cost, with a mix of uploads that
+pass and fail the art gate.
+"""
+import io
+import random
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+DEFAULT_SIZES = ((640, 480), (1024, 768), (1600, 1200), (3000, 2000))
+
+
+class CorpusImage(NamedTuple):
+    name: str
+    kind: str
+    width: int
+    height: int
+    data: bytes
+
+
+def _gradient(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    top, bottom = rng.integers(0, 256, size=(2, 3))
+    t = np.linspace(0.0, 1.0, height)[:, None, None]
+    column = top[None, None, :] * (1 - t) + bottom[None, None, :] * t
+    return np.broadcast_to(column, (height, width, 3)).astype(np.uint8)
+
+
+def painting(rng: np.random.Generator, width: int, height: int) -> Image.Image:
+    image = Image.fromarray(_gradient(rng, width, height).copy())
+    draw = ImageDraw.Draw(image)
+    palette = rng.integers(0, 256, size=(6, 3))
+    for _ in range(int(rng.integers(40, 120))):
+        color = tuple(int(c) for c in palette[rng.integers(0, len(palette))])
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        dx, dy = rng.integers(-width // 4, width // 4 + 1), rng.integers(-height // 4, height // 4 + 1)
+        stroke = max(2, int(min(width, height) * rng.uniform(0.005, 0.04)))
+        if rng.random() < 0.5:
+            draw.line([(x, y), (x + int(dx), y + int(dy))], fill=color, width=stroke)
+        else:
+            draw.ellipse([x, y, x + abs(int(dx)) + 1, y + abs(int(dy)) + 1], fill=color)
+    return image.filter(ImageFilter.GaussianBlur(radius=1.5))
+
+
+def photo(rng: np.random.Generator, width: int, height: int) -> Image.Image:
+    pixels = _gradient(rng, width, height).astype(np.int16)
+    horizon = int(height * rng.uniform(0.4, 0.7))
+    pixels[horizon:] = rng.integers(40, 140, size=3)
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(image)
+    for _ in range(int(rng.integers(3, 12))):
+        w = int(width * rng.uniform(0.05, 0.2))
+        h = int(height * rng.uniform(0.1, 0.5))
+        x = int(rng.integers(0, max(1, width - w)))
+        color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+        draw.rectangle([x, horizon - h, x + w, horizon], fill=color)
+    noisy = np.asarray(image).astype(np.int16) + rng.normal(0, 8, size=(height, width, 3)).astype(np.int16)
+    return Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8))
+
+
+def synthetic_image(kind: str, width: int, height: int, seed: int, quality: int = 90) -> bytes:
+    rng = np.random.default_rng(seed)
+    image = painting(rng, width, height) if kind == "painting" else photo(rng, width, height)
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def build_corpus(count: int, photo_fraction: float = 0.2, sizes: Sequence[Tuple[int, int]] = DEFAULT_SIZES,
+                 seed: int = 0) -> List[CorpusImage]:
+    chooser = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        kind = "photo" if chooser.random() < photo_fraction else "painting"
+        width, height = chooser.choice(list(sizes))
+        if chooser.random() < 0.5:
+            width, height = height, width
+        data = synthetic_image(kind, width, height, seed=seed * 100003 + index)
+        corpus.append(CorpusImage(f"{kind}_{index:04d}.jpg", kind, width, height, data))
+    return corpus
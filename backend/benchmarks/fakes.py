@@ -0,0 +1,310 @@
+"""
+In-process stand-ins for the Supabase client used by the backend.
+
+FakeSupabase implements the slice of the supabase-py query builder the API
+uses (select/insert/update/upsert/delete, eq/neq/lt/lte/gt/gte/in_/or_,
+order, limit, range, single) over in-memory tables, plus bucket storage.
+Each ``execute()`` and storage call sleeps for a configurable round trip
+so results stay comparable to a hosted database without needing one.
+"""
+import itertools
+import re
+import sys
+import threading
+import time
+import types
+from typing import Dict, List, Optional
+
+
+class FakeAPIError(Exception):
+    pass
+
+
+class FakeResponse:
+    def __init__(self, data, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _comparable(a, b):
+    # Query params arrive as strings; compare numbers as numbers
+    if isinstance(a, (int, float)) and isinstance(b, str):
+        try:
+            return a, type(a)(b)
+        except ValueError:
+            return str(a), b
+    if isinstance(b, (int, float)) and isinstance(a, str):
+        try:
+            return type(b)(a), b
+        except ValueError:
+            return a, str(b)
+    return a, b
+
+
+def _match(row: dict, column: str, op: str, value) -> bool:
+    current = row.get(column)
+    if op == "in":
+        return any(_match(row, column, "eq", v) for v in value)
+    if op == "is":
+        return current is None if value in (None, "null") else current == value
+    if current is None:
+        return False
+    current, value = _comparable(current, value)
+    if op == "eq":
+        return current == value
+    if op == "neq":
+        return current != value
+    if op == "lt":
+        return current < value
+    if op == "lte":
+        return current <= value
+    if op == "gt":
+        return current > value
+    if op == "gte":
+        return current >= value
+    raise FakeAPIError(f"Unsupported operator {op}")
+
+
+def _split_top_level(expr: str) -> List[str]:
+    parts, depth, current = [], 0, ""
+    for char in expr:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _parse_or(expr: str):
+    """PostgREST ``or`` filter: ``a.lt.1,and(a.eq.1,b.lt.2)`` → predicate."""
+    clauses = []
+    for part in _split_top_level(expr):
+        group = re.fullmatch(r"and\((.*)\)", part.strip())
+        if group:
+            inner = [_parse_or(p) for p in _split_top_level(group.group(1))]
+            clauses.append(lambda row, inner=inner: all(p(row) for p in inner))
+            continue
+        column, op, value = part.strip().split(".", 2)
+        value = value.strip('"')
+        clauses.append(lambda row, c=column, o=op, v=value: _match(row, c, o, v))
+    return lambda row: any(clause(row) for clause in clauses)
+
+
+# -------------------- TABLES --------------------
+class FakeQuery:
+    def __init__(self, client: "FakeSupabase", table: str):
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._columns = None
+        self._payload = None
+        self._on_conflict = None
+        self._filters = []
+        self._orders = []
+        self._limit = None
+        self._offset = 0
+        self._single = False
+        self._maybe_single = False
+        self._count = None
+
+    # operations
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        self._columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        self._count = count
+        return self
+
+    def insert(self, rows):
+        self._op, self._payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: Optional[str] = None):
+        self._op, self._payload, self._on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values: dict):
+        self._op, self._payload = "update", values
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    # filters
+    def _filter(self, column, op, value):
+        self._filters.append(lambda row: _match(row, column, op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", list(values))
+
+    def is_(self, column, value):
+        return self._filter(column, "is", value)
+
+    def or_(self, expr: str):
+        self._filters.append(_parse_or(expr))
+        return self
+
+    # modifiers
+    def order(self, column: str, desc: bool = False):
+        self._orders.append((column, desc))
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    def maybe_single(self):
+        self._maybe_single = True
+        return self
+
+    def execute(self) -> FakeResponse:
+        self._client.round_trip("db")
+        with self._client.lock:
+            rows = self._client.tables.setdefault(self._table, [])
+            if self._op in ("insert", "upsert"):
+                data = self._write(rows)
+            else:
+                matched = [row for row in rows if all(f(row) for f in self._filters)]
+                if self._op == "update":
+                    for row in matched:
+                        row.update(self._payload)
+                    data = [dict(row) for row in matched]
+                elif self._op == "delete":
+                    ids = {id(row) for row in matched}
+                    rows[:] = [row for row in rows if id(row) not in ids]
+                    data = [dict(row) for row in matched]
+                else:
+                    data = self._read(matched)
+            total = len(data) if isinstance(data, list) else None
+
+        if self._single or self._maybe_single:
+            if len(data) == 1:
+                return FakeResponse(data[0])
+            if self._maybe_single and not data:
+                return None
+            raise FakeAPIError("JSON object requested, multiple (or no) rows returned")
+        return FakeResponse(data, count=total if self._count else None)
+
+    def _write(self, rows: List[dict]) -> List[dict]:
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        written = []
+        for values in payload:
+            row = dict(values)
+            existing = None
+            if self._op == "upsert":
+                keys = [k.strip() for k in (self._on_conflict or "id").split(",")]
+                existing = next((r for r in rows if all(r.get(k) == row.get(k) for k in keys)), None)
+            if existing is not None:
+                existing.update(row)
+                written.append(dict(existing))
+                continue
+            row.setdefault("id", next(self._client.ids))
+            rows.append(row)
+            written.append(dict(row))
+        return written
+
+    def _read(self, matched: List[dict]) -> List[dict]:
+        for column, desc in reversed(self._orders):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        end = None if self._limit is None else self._offset + self._limit
+        matched = matched[self._offset:end]
+        if self._columns is None:
+            return [dict(row) for row in matched]
+        return [{c: row.get(c) for c in self._columns} for row in matched]
+
+
+# -------------------- STORAGE --------------------
+class FakeBucket:
+    def __init__(self, client: "FakeSupabase", name: str):
+        self._client = client
+        self.name = name
+
+    def upload(self, path: str, file_bytes: bytes, *args, **kwargs):
+        self._client.round_trip("storage")
+        with self._client.lock:
+            # Only sizes are kept; the corpus is regenerated on demand
+            self._client.objects[(self.name, path)] = len(file_bytes)
+        return {"Key": f"{self.name}/{path}"}
+
+    def get_public_url(self, path: str) -> str:
+        return f"http://fake-storage.local/{self.name}/{path}"
+
+    def remove(self, paths):
+        self._client.round_trip("storage")
+        paths = [paths] if isinstance(paths, str) else paths
+        with self._client.lock:
+            for path in paths:
+                self._client.objects.pop((self.name, path), None)
+        return [{"name": path} for path in paths]
+
+
+class FakeStorage:
+    def __init__(self, client: "FakeSupabase"):
+        self._client = client
+
+    def from_(self, bucket: str) -> FakeBucket:
+        return FakeBucket(self._client, bucket)
+
+
+class FakeSupabase:
+    def __init__(self, db_latency_ms: float = 0.0, storage_latency_ms: float = 0.0):
+        self.latency = {"db": db_latency_ms / 1000.0, "storage": storage_latency_ms / 1000.0}
+        self.lock = threading.Lock()
+        self.tables: Dict[str, List[dict]] = {}
+        self.objects: Dict[tuple, int] = {}
+        self.ids = itertools.count(1)
+        self.calls = {"db": 0, "storage": 0}
+        self.storage = FakeStorage(self)
+
+    def round_trip(self, kind: str):
+        with self.lock:
+            self.calls[kind] += 1
+        if self.latency[kind] > 0:
+            time.sleep(self.latency[kind])
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+
+def install_fake_supabase(db_latency_ms: float = 0.0, storage_latency_ms: float = 0.0) -> FakeSupabase:
+    """
+    Registers a FakeSupabase as ``app.db.supabase`` and ``db`` (the two modules
+    the backend imports its client from). Call before importing ``app.main``.
+    """
+    client = FakeSupabase(db_latency_ms, storage_latency_ms)
+    for name in ("app.db.supabase", "db"):
+        module = types.ModuleType(name)
+        module.supabase = client
+        sys.modules[name] = module
+    return client
@@ -0,0 +1,220 @@
+"""
+Replay a captured traffic trace against a running server.
+
+    python -m benchmarks.replay traffic.jsonl --speed 1
+    python -m benchmarks.replay traffic.jsonl --speed 10 --base-url http://127.0.0.1:8000
+    python -m benchmarks.replay traffic.jsonl --speed max --concurrency 32 --output replay.json
+
+The trace is the JSONL written by the capture middleware (TRAFFIC_CAPTURE_PATH).
+Requests are sent at their recorded offsets divided by --speed, or as fast
+as --concurrency allows with --speed max. Uploads are regenerated as
+synthetic images with the recorded dimensions; the same recorded content
+hash always maps to the same bytes, so repeat uploads stay repeats. Uploads
+that were rejected as not-art when captured are replayed as photos, the rest
+as paintings. Recorded users keep their pseudonyms as replay-<key>@example.com.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+from app.utils.lru_cache import LRUCache
+from benchmarks.corpus import synthetic_image
+from benchmarks.run import latency_summary
+
+ALLOWED_METHODS = {"GET", "POST", "DELETE", "PUT", "PATCH"}
+
+
+# -------------------- TRACE --------------------
+def load_trace(path: str, routes: Optional[List[str]] = None) -> List[dict]:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("method") not in ALLOWED_METHODS:
+                continue
+            if routes and record.get("route") not in routes:
+                continue
+            records.append(record)
+    records.sort(key=lambda r: r["ts"])
+    return records
+
+
+def _user(fields: Dict) -> Dict:
+    fields = dict(fields or {})
+    key = fields.pop("user", None)
+    if key is not None:
+        fields["user_email"] = f"replay-{key}@example.com"
+    # Fields recorded by name only get a harmless placeholder
+    return {name: ("replay" if value is None else value) for name, value in fields.items()}
+
+
+class ImageFactory:
+    """
+    Synthetic stand-ins keyed by recorded hash, so repeats replay identical bytes.
+
+    Only the most recent images are kept; an evicted one is regenerated from
+    the same seed, so the bytes are unchanged.
+    """
+
+    def __init__(self, max_side: int = 4096, max_entries: int = 256):
+        self.max_side = max_side
+        self._cache = LRUCache(max_entries)
+
+    def get(self, info: dict, kind: str) -> bytes:
+        key = f"{info.get('sha256')}:{kind}"
+        data = self._cache.get(key)
+        if data is None:
+            width = min(int(info.get("width") or 1024), self.max_side)
+            height = min(int(info.get("height") or 768), self.max_side)
+            seed = int(info.get("sha256") or "0", 16) % (2 ** 32)
+            data = synthetic_image(kind, width, height, seed)
+            self._cache.set(key, data)
+        return data
+
+
+def build_request(record: dict, images: ImageFactory) -> dict:
+    rejected = record.get("route") == "/predict/" and record.get("status") == 400
+    files = {}
+    for info in record.get("files", []):
+        if info.get("format") in (None, "zip"):
+            continue  # archives and non-images are not reproducible from their shape
+        data = images.get(info, "photo" if rejected else "painting")
+        files[info["field"]] = (f"replay_{info.get('sha256')}{info.get('ext') or '.jpg'}", data, "image/jpeg")
+    return {
+        "method": record["method"],
+        "url": record["route"],
+        "params": _user(record.get("params")),
+        "data": _user(record.get("form")) or None,
+        "files": files or None,
+    }
+
+
+# -------------------- DRIVER --------------------
+async def replay(records: List[dict], base_url: str, speed: Optional[float], concurrency: int, images: ImageFactory):
+    import httpx
+
+    results: List[dict] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    t0 = records[0]["ts"] if records else 0.0
+    loop = asyncio.get_running_loop()
+
+    async def send(client, record, request: dict, scheduled: float):
+        async with semaphore:
+            lag = time.perf_counter() - scheduled
+            start = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                await response.aread()
+                status = response.status_code
+            except Exception as e:
+                status = f"exception: {type(e).__name__}"
+            results.append({
+                "route": record["route"],
+                "method": record["method"],
+                "status": status,
+                "recorded_status": record.get("status"),
+                "seconds": time.perf_counter() - start,
+                "recorded_ms": record.get("duration_ms"),
+                "lag_ms": max(0.0, lag * 1000),
+            })
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        start = time.perf_counter()
+        tasks = []
+        for record in records:
+            # Image generation is CPU-bound: do it off the event loop, ahead of
+            # the request's slot, so it never counts towards measured latency.
+            request = await loop.run_in_executor(None, build_request, record, images)
+            offset = 0.0 if speed is None else (record["ts"] - t0) / speed
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(send(client, record, request, scheduled if speed else time.perf_counter())))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return results, elapsed
+
+
+def summarize(results: List[dict], elapsed: float) -> dict:
+    by_route: Dict[str, List[dict]] = {}
+    for result in results:
+        by_route.setdefault(f"{result['method']} {result['route']}", []).append(result)
+
+    routes = {}
+    for key, items in sorted(by_route.items()):
+        statuses: Dict[str, int] = {}
+        for item in items:
+            statuses[str(item["status"])] = statuses.get(str(item["status"]), 0) + 1
+        recorded = [item["recorded_ms"] / 1000 for item in items if item["recorded_ms"] is not None]
+        routes[key] = {
+            "requests": len(items),
+            "status_counts": statuses,
+            "status_mismatches": sum(str(i["status"]) != str(i["recorded_status"]) for i in items),
+            "latency_ms": latency_summary([i["seconds"] for i in items]),
+            "recorded_latency_ms": latency_summary(recorded),
+        }
+    return {
+        "requests": len(results),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "schedule_lag_ms": latency_summary([r["lag_ms"] / 1000 for r in results]),
+        "routes": routes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", help="JSONL written by the traffic capture middleware")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--speed", default="1", help="time compression factor (1, 10, …) or 'max'")
+    parser.add_argument("--concurrency", type=int, default=64, help="cap on requests in flight")
+    parser.add_argument("--routes", help="comma-separated route templates to keep, e.g. /predict/,/gallery/")
+    parser.add_argument("--limit", type=int, help="replay only the first N records")
+    parser.add_argument("--output", help="write the JSON summary here")
+    args = parser.parse_args(argv)
+
+    speed = None if args.speed == "max" else float(args.speed)
+    if speed is not None and speed <= 0:
+        parser.error("--speed must be positive or 'max'")
+
+    routes = [r.strip() for r in args.routes.split(",")] if args.routes else None
+    records = load_trace(args.trace, routes)[: args.limit]
+    if not records:
+        print(f"❌ No replayable records in {args.trace}")
+        return 1
+
+    span = records[-1]["ts"] - records[0]["ts"]
+    print(f"Replaying {len(records)} requests spanning {span:.1f}s at "
+          f"{'max speed' if speed is None else f'{speed:g}x'} against {args.base_url}…")
+    results, elapsed = asyncio.run(replay(records, args.base_url, speed, args.concurrency, ImageFactory()))
+    summary = summarize(results, elapsed)
+    summary["meta"] = {"trace": args.trace, "speed": args.speed, "concurrency": args.concurrency}
+
+    print(f"\n{summary['requests']} requests in {summary['seconds']}s ({summary['throughput_rps']} req/s), "
+          f"schedule lag p95 {summary['schedule_lag_ms']['p95']} ms")
+    for key, route in summary["routes"].items():
+        lat, rec = route["latency_ms"], route["recorded_latency_ms"]
+        print(f"{key:<32} n={route['requests']:<6} p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} ms "
+              f"(recorded p95={rec['p95']} ms) mismatched status={route['status_mismatches']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n✅ Summary written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+"""
+End-to-end load benchmark for the backend.
+
+    python -m benchmarks.run --concurrency 1,8,32 --requests 200 --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.run --endpoints predict,history --compare benchmarks/results/baseline.json
+
+Boots ``app.main:app`` under uvicorn in this process with an in-memory
+Supabase (benchmarks/fakes.py, simulated round trips) and the offline Gemini
+stand-in (GEMINI_FAKE), seeds every benchmark user with history rows, then
+drives each endpoint in turn at each concurrency level with a synthetic
+painting/photo corpus (benchmarks/corpus.py).
+
+The report has throughput and p50/p95/p99 latency per endpoint, plus
+per-stage latency taken from the /metrics histograms scraped around each
+run. --compare checks p95 latency and throughput against an earlier report.
+It exits 1 if anything got worse by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+ENDPOINTS = ("predict", "transfer-style", "history", "gallery")
+STYLES = ("candy", "mosaic", "udnie", "rain_princess")
+
+
+# -------------------- APP UNDER TEST --------------------
+def configure_environment(args, cache_dir: str):
+    """Must run before anything under app/ is imported: config reads env at import."""
+    os.environ["GEMINI_FAKE"] = "1"
+    os.environ["GEMINI_FAKE_LATENCY_MS"] = str(args.gemini_latency_ms)
+    os.environ["CACHE_DIR"] = cache_dir
+    os.environ.setdefault("SUPABASE_BUCKET", "benchmark")
+    os.environ.setdefault("MODEL_LOADING", "eager")
+    if args.no_cache:
+        os.environ["PREDICTION_CACHE_ENABLED"] = "0"
+
+
+def start_server(port: int):
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="benchmark-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Server failed to start")
+        time.sleep(0.1)
+    return server, thread
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed_history(client, users: List[str], rows_per_user: int, seed: int):
+    rng = random.Random(seed)
+    styles = ["Impressionism", "Cubism", "Baroque", "Realism", "Romanticism", "Expressionism"]
+    start = datetime(2024, 1, 1)
+    for user in users:
+        client.tables.setdefault("users", []).append({"id": next(client.ids), "email": user})
+        for i in range(rows_per_user):
+            client.tables.setdefault("predictions", []).append({
+                "id": next(client.ids),
+                "user_email": user,
+                "style": rng.choice(styles),
+                "image_url": f"http://fake-storage.local/benchmark/seed_{user}_{i}.jpg",
+                "timestamp": (start + timedelta(minutes=i)).isoformat(),
+                "confidence": round(rng.uniform(0.3, 0.99), 4),
+                "description": "Seeded benchmark row. " * 20,
+                "storage_path": f"seed_{user}_{i}.jpg",
+                "image_hash": f"{rng.getrandbits(64):016x}",
+            })
+
+
+# -------------------- LOAD DRIVER --------------------
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q
+    low, high = int(rank), min(int(rank) + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    ms = [s * 1000 for s in seconds]
+    return {
+        "mean": round(sum(ms) / len(ms), 2) if ms else 0.0,
+        "p50": round(percentile(ms, 0.50), 2),
+        "p95": round(percentile(ms, 0.95), 2),
+        "p99": round(percentile(ms, 0.99), 2),
+        "max": round(max(ms), 2) if ms else 0.0,
+    }
+
+
+def make_request(endpoint: str, corpus, users: List[str], styles: List[str], rng: random.Random):
+    """Returns (method, path, request kwargs) for one call."""
+    user = rng.choice(users)
+    if endpoint == "predict":
+        image = rng.choice(corpus)
+        return "POST", "/predict/", {
+            "files": {"file": (image.name, image.data, "image/jpeg")},
+            "data": {"user_email": user},
+        }
+    if endpoint == "transfer-style":
+        image = rng.choice(corpus)
+        return "POST", "/transfer-style/", {
+            "files": {"image": (image.name, image.data, "image/jpeg")},
+            "data": {"style_name": rng.choice(styles)},
+        }
+    if endpoint == "history":
+        return "GET", "/history/", {"params": {"user_email": user}}
+    return "GET", "/gallery/", {"params": {"user_email": user}}
+
+
+async def drive(base_url: str, endpoint: str, total: int, concurrency: int, corpus, users, styles, seed: int):
+    import httpx
+
+    rng = random.Random(seed)
+    calls = [make_request(endpoint, corpus, users, styles, rng) for _ in range(total)]
+    latencies, statuses, errors = [], {}, []
+    next_call = iter(calls)
+
+    async def worker(client):
+        for method, path, kwargs in next_call:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                await response.aread()
+                status = response.status_code
+            except Exception as e:
+                status = "exception"
+                errors.append(str(e))
+            latencies.append(time.perf_counter() - start)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "status_counts": statuses,
+        "latency_ms": latency_summary(latencies),
+        "sample_errors": errors[:5],
+    }
+
+
+# -------------------- STAGE METRICS --------------------
+_SAMPLE = re.compile(r'^painting_stage_seconds_(bucket|sum|count)\{stage="([^"]+)"(?:,le="([^"]+)")?\} (\S+)$')
+
+
+def scrape_stages(base_url: str) -> Dict[str, dict]:
+    import httpx
+
+    text = httpx.get(f"{base_url}/metrics", timeout=30).text
+    stages: Dict[str, dict] = {}
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if not match:
+            continue
+        kind, stage, le, value = match.groups()
+        entry = stages.setdefault(stage, {"buckets": {}, "sum": 0.0, "count": 0.0})
+        if kind == "bucket":
+            entry["buckets"][float("inf") if le == "+Inf" else float(le)] = float(value)
+        else:
+            entry[kind] = float(value)
+    return stages
+
+
+def _bucket_quantile(buckets: Dict[float, float], q: float) -> float:
+    """Prometheus-style histogram_quantile over cumulative bucket counts."""
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]] if bounds else 0
+    if total <= 0:
+        return 0.0
+    rank = q * total
+    previous_bound, previous_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float("inf"):
+                return previous_bound
+            if count == previous_count:
+                return bound
+            return previous_bound + (bound - previous_bound) * (rank - previous_count) / (count - previous_count)
+        previous_bound, previous_count = bound, count
+    return previous_bound
+
+
+def stage_delta(before: Dict[str, dict], after: Dict[str, dict]) -> Dict[str, dict]:
+    report = {}
+    for stage, entry in after.items():
+        base = before.get(stage, {"buckets": {}, "sum": 0.0, "count": 0.0})
+        count = entry["count"] - base["count"]
+        if count <= 0:
+            continue
+        buckets = {b: c - base["buckets"].get(b, 0.0) for b, c in entry["buckets"].items()}
+        report[stage] = {
+            "count": int(count),
+            "mean_ms": round(1000 * (entry["sum"] - base["sum"]) / count, 2),
+            "p50_ms": round(1000 * _bucket_quantile(buckets, 0.50), 2),
+            "p95_ms": round(1000 * _bucket_quantile(buckets, 0.95), 2),
+            "p99_ms": round(1000 * _bucket_quantile(buckets, 0.99), 2),
+        }
+    return report
+
+
+# -------------------- COMPARISON --------------------
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions of p95 latency or throughput beyond ``tolerance`` (a fraction)."""
+    regressions = []
+    for key, run in current["runs"].items():
+        old = baseline.get("runs", {}).get(key)
+        if old is None:
+            continue
+        old_p95, new_p95 = old["latency_ms"]["p95"], run["latency_ms"]["p95"]
+        if old_p95 > 0 and new_p95 > old_p95 * (1 + tolerance):
+            regressions.append(f"{key}: p95 {old_p95} ms → {new_p95} ms")
+        old_rps, new_rps = old["throughput_rps"], run["throughput_rps"]
+        if old_rps > 0 and new_rps < old_rps * (1 - tolerance):
+            regressions.append(f"{key}: throughput {old_rps} → {new_rps} req/s")
+    return regressions
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_report(report: dict):
+    print(f"\n{'run':<28} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}  status")
+    for key, run in report["runs"].items():
+        lat = run["latency_ms"]
+        print(f"{key:<28} {run['throughput_rps']:>8} {lat['p50']:>9} {lat['p95']:>9} {lat['p99']:>9}  {run['status_counts']}")
+        for stage, numbers in sorted(run["stages"].items()):
+            print(f"    {stage:<24} n={numbers['count']:<6} mean={numbers['mean_ms']}ms "
+                  f"p50={numbers['p50_ms']}ms p95={numbers['p95_ms']}ms p99={numbers['p99_ms']}ms")
+
+
+# -------------------- MAIN --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help=f"comma-separated subset of {', '.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", default="1,8", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint and concurrency level")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per endpoint first")
+    parser.add_argument("--corpus-size", type=int, default=64)
+    parser.add_argument("--photo-fraction", type=float, default=0.2)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--history-rows", type=int, default=200, help="seeded predictions per user")
+    parser.add_argument("--db-latency-ms", type=float, default=15.0)
+    parser.add_argument("--storage-latency-ms", type=float, default=40.0)
+    parser.add_argument("--gemini-latency-ms", type=float, default=800.0)
+    parser.add_argument("--no-cache", action="store_true", help="disable the prediction cache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed p95/throughput drift")
+    args = parser.parse_args(argv)
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    configure_environment(args, tempfile.mkdtemp(prefix="painting-bench-"))
+
+    from benchmarks.fakes import install_fake_supabase
+    from benchmarks.corpus import build_corpus
+
+    client = install_fake_supabase(args.db_latency_ms, args.storage_latency_ms)
+    users = [f"bench{i}@example.com" for i in range(args.users)]
+    seed_history(client, users, args.history_rows, args.seed)
+
+    print(f"Building a {args.corpus_size}-image corpus…")
+    corpus = build_corpus(args.corpus_size, args.photo_fraction, seed=args.seed)
+
+    port = free_port()
+    print("Starting the app (models load before the first run)…")
+    server, thread = start_server(port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    from app.api.style_transfer import style_model_exists
+    styles = [s for s in STYLES if style_model_exists(s)]
+    if "transfer-style" in endpoints and not styles:
+        print("⚠️ No style models under app/models/saved_models; skipping transfer-style")
+        endpoints.remove("transfer-style")
+
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "runs": {},
+    }
+
+    try:
+        for endpoint in endpoints:
+            if args.warmup:
+                asyncio.run(drive(base_url, endpoint, args.warmup, 1, corpus, users, styles, args.seed - 1))
+            for level in levels:
+                key = f"{endpoint}@c{level}"
+                print(f"Running {key} ({args.requests} requests)…")
+                before = scrape_stages(base_url)
+                run = asyncio.run(drive(base_url, endpoint, args.requests, level, corpus, users, styles, args.seed + level))
+                run["stages"] = stage_delta(before, scrape_stages(base_url))
+                report["runs"][key] = run
+        report["fake_supabase_calls"] = dict(client.calls)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=30)
+
+    print_report(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against", args.compare)
+            for line in regressions:
+                print("  ", line)
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,8 @@ const HistoryPage = () => {
   const [filter, setFilter] = useState('');
   const [userEmail, setUserEmail] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const location = useLocation();
   const navigate = useNavigate();
 
@@ -37,25 +39,36 @@ const HistoryPage = () => {
     getUser();
   }, []);
 
-  // Fetch classification history
+  // One page of history, newest first; summary rows leave out the
+  // description, which the detail page fetches on demand
+  const fetchPage = async (cursor) => {
+    const params = new URLSearchParams({ user_email: userEmail, fields: 'summary' });
+    if (cursor) params.set('cursor', cursor);
+    const res = await fetch(`http://localhost:8000/history/?${params}`);
+    const page = await res.json();
+    setHistory((prev) => (cursor ? [...prev, ...page] : page));
+    setNextCursor(res.headers.get('X-Next-Cursor'));
+  };
+
+  // Fetch the first page of classification history
   useEffect(() => {
-    const fetchHistory = async () => {
-      if (!userEmail) return;
-      try {
-        const res = await fetch(
-          `http://localhost:8000/history/?user_email=${encodeURIComponent(userEmail)}`
-        );
-        const result = await res.json();
-        setHistory(result.reverse());
-      } catch (err) {
-        console.error('Error fetching history:', err);
-      } finally {
-        setLoading(false);
-      }
-    };
-    fetchHistory();
+    if (!userEmail) return;
+    fetchPage(null)
+      .catch((err) => console.error('Error fetching history:', err))
+      .finally(() => setLoading(false));
   }, [userEmail]);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      await fetchPage(nextCursor);
+    } catch (err) {
+      console.error('Error fetching history:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const deleteItem = async (id) => {
     try {
       const res = await fetch(
@@ -103,7 +116,7 @@ const HistoryPage = () => {
             <Search className="absolute left-3 top-1/2 -translate-y-1/2 w-5 h-5 text-gray-400" />
             <input
               type="text"
-              placeholder="Search by style or description..."
+              placeholder="Search by style..."
               value={filter}
               onChange={(e) => setFilter(e.target.value)}
               className="w-full bg-white/60 dark:bg-gray-900 border border-gray-300 dark:border-gray-600 focus:ring-2 focus:ring-indigo-500 focus:outline-none rounded-full py-2 pl-10 pr-4 text-sm text-gray-900 dark:text-white placeholder-gray-500 dark:placeholder-gray-400"
@@ -114,6 +127,7 @@ const HistoryPage = () => {
         {loading ? (
           <p className="text-center text-white">Loading...</p>
         ) : filteredHistory.length > 0 ? (
+          <>
           <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
             {filteredHistory.map((item) => (
               <Link
@@ -137,9 +151,11 @@ const HistoryPage = () => {
                         {((item.confidence || 0) * 100).toFixed(0)}%
                       </span>
                     </div>
-                    <p className="text-sm text-gray-600 dark:text-gray-400 line-clamp-2">
-                      {item.description}
-                    </p>
+                    {item.description && (
+                      <p className="text-sm text-gray-600 dark:text-gray-400 line-clamp-2">
+                        {item.description}
+                      </p>
+                    )}
                     <p className="text-xs text-gray-400 dark:text-gray-500 pt-2">
                       {item.timestamp
                         ? new Date(item.timestamp).toLocaleString()
@@ -157,6 +173,18 @@ const HistoryPage = () => {
               </Link>
             ))}
           </div>
+          {nextCursor && (
+            <div className="flex justify-center mt-8">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-6 py-2 bg-indigo-600 text-white font-semibold rounded-full shadow-lg hover:bg-indigo-700 disabled:opacity-60 transition-transform hover:scale-105"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
+          </>
         ) : (
           <div className="text-center py-24">
             <History className="w-16 h-16 mx-auto text-gray-500 dark:text-gray-400 mb-4" />
@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { useLocation, Link } from 'react-router-dom';
 import { ArrowLeft, Calendar, Percent, Tag, FileText } from 'lucide-react';
 import Aurora from '../components/Aurora';
@@ -6,6 +6,17 @@ import Aurora from '../components/Aurora';
 const PredictionDetail = () => {
   const location = useLocation();
   const { item } = location.state || {};
+  const [details, setDetails] = useState(null);
+
+  // History pages list summary rows without the description; fetch it here
+  useEffect(() => {
+    if (!item || 'description' in item) return;
+    const params = new URLSearchParams({ prediction_id: item.id, user_email: item.user_email });
+    fetch(`http://localhost:8000/prediction-details/?${params}`)
+      .then((res) => (res.ok ? res.json() : null))
+      .then(setDetails)
+      .catch((err) => console.error('Error fetching prediction details:', err));
+  }, [item]);
 
   if (!item) {
     return (
@@ -130,7 +141,9 @@ const PredictionDetail = () => {
                 <FileText size={18} /> Description
               </h3>
               <p className="text-gray-600 dark:text-gray-400 leading-relaxed">
-                {item.description || 'No description provided.'}
+                {'description' in item || details
+                  ? (item.description ?? details?.description) || 'No description provided.'
+                  : 'Loading description...'}
               </p>
             </div>
           </div>